@@ -1,3 +1,16 @@
-from awspub.api import cleanup, create, list, publish, verify
+import typing
 
 __all__ = ["create", "list", "publish", "cleanup", "verify"]
+
+if typing.TYPE_CHECKING:
+    from awspub.api import cleanup, create, list, publish, verify  # noqa: F401
+
+
+def __getattr__(name):
+    # lazy re-export of the api functions (PEP 562) so importing light modules
+    # like awspub.context doesn't pull in boto3 through awspub.api
+    if name in __all__:
+        from awspub import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
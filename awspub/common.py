@@ -1,12 +1,61 @@
+import functools
 import logging
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-import boto3
-from mypy_boto3_ec2.client import EC2Client
+if TYPE_CHECKING:
+    from mypy_boto3_ec2.client import EC2Client
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _get_client(service_name: str, region_name: Optional[str] = None):
+    """
+    Get a cached boto3 client for the given service and region.
+    Creating a client is expensive (SSL context setup, endpoint resolution) and
+    clients are thread-safe for API calls so they are reused per (service, region)
+    for the process lifetime.
+    boto3.client() goes through the shared default session so the service model
+    loader cache is reused across services; an explicit Session object would not
+    buy anything on top of the client caching here.
+
+    :param service_name: the boto3 service name (eg. "ec2")
+    :type service_name: str
+    :param region_name: an optional region name
+    :type region_name: Optional[str]
+    :return: a boto3 client for the given service and region
+    """
+    # boto3/botocore are imported lazily so code paths that never talk to AWS
+    # (eg. config validation) don't pay the expensive boto3 import
+    import boto3
+    import botocore.config
+
+    # adaptive retries implement client-side rate limiting with token-bucket backoff
+    # and jitter. that matters most for EC2 snapshot copies which are throttled hard
+    # (only a handful of concurrent copies per region) but doesn't hurt elsewhere
+    client_config = botocore.config.Config(retries={"mode": "adaptive", "max_attempts": 10})
+    # the boto3-stubs overloads only accept per-service Literal names, not a
+    # generic str - the call is fine at runtime for any valid service name
+    return boto3.client(service_name, region_name=region_name, config=client_config)  # type: ignore[call-overload]
+
+
+@functools.lru_cache(maxsize=16)
+def _get_region_names(region_to_query: str) -> Tuple[str, ...]:
+    """
+    Get all available region names for the partition of the given region.
+    The region list doesn't change within one process run so the
+    describe_regions call is memoized.
+
+    :param region_to_query: region name of current partition
+    :type region_to_query: str
+    :return: tuple of region names
+    :rtype: Tuple[str, ...]
+    """
+    ec2client: "EC2Client" = _get_client("ec2", region_to_query)
+    resp = ec2client.describe_regions()
+    return tuple(r["RegionName"] for r in resp["Regions"])
+
+
 def _split_partition(val: str) -> Tuple[str, str]:
     """
     Split a string into partition and resource, separated by a colon. If no partition is given, assume "aws"
@@ -42,10 +91,8 @@ def _get_regions(region_to_query: str, regions_allowlist: List[str]) -> List[str
     :rtype: List[str]
     """
 
-    # get all available regions
-    ec2client: EC2Client = boto3.client("ec2", region_name=region_to_query)
-    resp = ec2client.describe_regions()
-    ec2_regions_all = [r["RegionName"] for r in resp["Regions"]]
+    # get all available regions (memoized per queried region)
+    ec2_regions_all = _get_region_names(region_to_query)
 
     if regions_allowlist:
         # filter out regions that are not available in the current partition
@@ -59,6 +106,6 @@ def _get_regions(region_to_query: str, regions_allowlist: List[str]) -> List[str
                 " Ignoring those."
             )
     else:
-        regions = ec2_regions_all
+        regions = list(ec2_regions_all)
 
     return regions
@@ -17,6 +17,12 @@ class ConfigS3Model(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     bucket_name: str = Field(description="The S3 bucket name")
+    max_concurrent_parts: int = Field(
+        description="Optional number of parts that are uploaded concurrently during "
+        "the multipart upload (default: 10, must be >= 1)",
+        default=10,
+        ge=1,
+    )
 
 
 class ConfigSourceModel(BaseModel):
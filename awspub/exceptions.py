@@ -16,6 +16,10 @@ class BucketDoesNotExistException(Exception):
         super().__init__(msg, *args, **kwargs)
 
 
+class SnapshotWaitException(Exception):
+    pass
+
+
 class AWSNotificationException(Exception):
     pass
 
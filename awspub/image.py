@@ -1,15 +1,15 @@
+import functools
 import hashlib
 import logging
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-import boto3
 from mypy_boto3_ec2.client import EC2Client
 from mypy_boto3_ssm import SSMClient
 
 from awspub import exceptions
-from awspub.common import _get_regions, _split_partition
+from awspub.common import _get_client, _get_regions, _split_partition
 from awspub.context import Context
 from awspub.image_marketplace import ImageMarketplace
 from awspub.s3 import S3
@@ -19,7 +19,7 @@ from awspub.sns import SNSNotification
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class _ImageInfo:
     """
     Information about a image from EC2
@@ -63,6 +63,8 @@ class Image:
 
         self._snapshot: Snapshot = Snapshot(context)
         self._s3: S3 = S3(context)
+        # cache for _get() lookups used by the read-only paths (see _get_cached())
+        self._image_info_by_region: Dict[str, Optional[_ImageInfo]] = {}
 
     def __repr__(self):
         return f"<{self.__class__} :'{self.image_name}' (snapshot name: {self.snapshot_name})"
@@ -81,10 +83,12 @@ class Image:
         """
         return self._image_name
 
-    @property
+    @functools.cached_property
     def snapshot_name(self) -> str:
         """
-        Get the snapshot name which is a sha256 hexdigest
+        Get the snapshot name which is a sha256 hexdigest.
+        The name is deterministic for a given context/image so it is computed
+        once per instance.
 
         The snapshot name is the sha256 hexdigest of the source file given in the source->path
         configuration option.
@@ -102,21 +106,24 @@ class Image:
         Note that both options ("separate_snapshot" and "billing_products") can be combined
         and the snapshot calculation steps would be combined, too.
         """
-        s_name = self._ctx.source_sha256
+        # if separate_snapshot and billing_products have no effect, don't do another
+        # sha256 of the source_sha256 to simplify things
+        if self.conf["separate_snapshot"] is not True and not self.conf["billing_products"]:
+            return self._ctx.source_sha256
+
+        # hash the concatenated hexdigests. the hash state for the common
+        # source_sha256 prefix is cloned from the context instead of re-computed.
+        # the suffixes must stay ascii hexdigest strings fed via update() to keep
+        # the resulting names identical to the historical concatenated-string form
+        sha256_hash = self._ctx._snapshot_base_hash.copy()
         if self.conf["separate_snapshot"] is True:
-            s_name += hashlib.sha256(self.image_name.encode("utf-8")).hexdigest()
+            sha256_hash.update(hashlib.sha256(self.image_name.encode("utf-8")).hexdigest().encode("ascii"))
 
         if self.conf["billing_products"]:
             for bp in self.conf["billing_products"]:
-                s_name += hashlib.sha256(bp.encode("utf-8")).hexdigest()
-
-        # in the separate_snapshot and billing_products had no effect, don't do another sha256 of
-        # the source_sha256 to simplify things
-        if s_name == self._ctx.source_sha256:
-            return s_name
+                sha256_hash.update(hashlib.sha256(bp.encode("utf-8")).hexdigest().encode("ascii"))
 
-        # do a sha256 of the concatenated string
-        return hashlib.sha256(s_name.encode("utf-8")).hexdigest()
+        return sha256_hash.hexdigest()
 
     @property
     def image_regions(self) -> List[str]:
@@ -129,15 +136,17 @@ class Image:
             self._image_regions_cached = True
         return self._image_regions
 
-    @property
+    @functools.cached_property
     def _tags(self):
         """
         Get the tags for this image (common tags + image specific tags)
-        image specific tags override common tags
+        image specific tags override common tags (a plain dict merge, so linear).
+        The result is cached per instance since the tags can't change after
+        construction.
         """
         tags = []
-        # the common tags
-        tags_dict = self._ctx.tags_dict
+        # the common tags (frozen on the context at construction time)
+        tags_dict = dict(self._ctx.common_tags)
         # the image specific tags
         tags_dict.update(self.conf.get("tags", {}))
         for name, value in tags_dict.items():
@@ -153,7 +162,7 @@ class Image:
         :rtype: List[Dict[str, str]]
         """
         # the current partition
-        partition_current = boto3.client("ec2").meta.partition
+        partition_current = _get_client("ec2").meta.partition
 
         share_list: List[Dict[str, str]] = []
         for share in share_conf:
@@ -178,7 +187,7 @@ class Image:
             return
 
         for region, image_info in images.items():
-            ec2client: EC2Client = boto3.client("ec2", region_name=region)
+            ec2client: EC2Client = _get_client("ec2", region)
             # modify image permissions
             ec2client.modify_image_attribute(
                 Attribute="LaunchPermission",
@@ -250,21 +259,37 @@ class Image:
                 f"name {self.image_name} in region {ec2client.meta.region_name}. There should be only 1."
             )
 
+    def _get_cached(self, region: str) -> Optional[_ImageInfo]:
+        """
+        Get the _ImageInfo for the current image in the given region, cached per
+        instance so read-only flows (eg. publish() which needs the image for the
+        public/SSM/marketplace steps) don't re-describe the same image per step.
+        create() keeps using _get() directly because it registers new images.
+
+        :param region: the region to look the image up in
+        :type region: str
+        :return: Either None or a _ImageInfo
+        :rtype: Optional[_ImageInfo]
+        """
+        if region not in self._image_info_by_region:
+            ec2client_region: EC2Client = _get_client("ec2", region)
+            self._image_info_by_region[region] = self._get(ec2client_region)
+        return self._image_info_by_region[region]
+
     def _put_ssm_parameters(self) -> None:
         """
         Push the configured SSM parameters to the parameter store
         """
         logger.info(f"Pushing SSM parameters for image {self.image_name} in {len(self.image_regions)} regions ...")
         for region in self.image_regions:
-            ec2client_region: EC2Client = boto3.client("ec2", region_name=region)
-            image_info: Optional[_ImageInfo] = self._get(ec2client_region)
+            image_info: Optional[_ImageInfo] = self._get_cached(region)
 
             # image in region not found
             if not image_info:
                 logger.error(f"image {self.image_name} not available in region {region}. can not push SSM parameter")
                 continue
 
-            ssmclient_region: SSMClient = boto3.client("ssm", region_name=region)
+            ssmclient_region: SSMClient = _get_client("ssm", region)
             # iterate over all defined parameters
             for parameter in self.conf["ssm_parameter"]:
                 # if overwrite is not allowed, check if the parameter is already there and if so, do nothing
@@ -302,8 +327,8 @@ class Image:
         logger.info(f"Make image {self.image_name} in {len(self.image_regions)} regions public ...")
 
         for region in self.image_regions:
-            ec2client_region: EC2Client = boto3.client("ec2", region_name=region)
-            image_info: Optional[_ImageInfo] = self._get(ec2client_region)
+            ec2client_region: EC2Client = _get_client("ec2", region)
+            image_info: Optional[_ImageInfo] = self._get_cached(region)
             if image_info:
                 ec2client_region.modify_image_attribute(
                     ImageId=image_info.image_id,
@@ -362,7 +387,7 @@ class Image:
         # do the cleanup - the image is marked as temporary
         logger.info(f"Cleanup image {self.image_name} ...")
         for region in self.image_regions:
-            ec2client_region: EC2Client = boto3.client("ec2", region_name=region)
+            ec2client_region: EC2Client = _get_client("ec2", region)
             image_info: Optional[_ImageInfo] = self._get(ec2client_region)
 
             if image_info:
@@ -391,7 +416,7 @@ class Image:
         """
         images: Dict[str, _ImageInfo] = dict()
         for region in self.image_regions:
-            ec2client_region: EC2Client = boto3.client("ec2", region_name=region)
+            ec2client_region: EC2Client = _get_client("ec2", region)
             image_info: Optional[_ImageInfo] = self._get(ec2client_region)
             if image_info:
                 images[region] = image_info
@@ -407,7 +432,7 @@ class Image:
         :rtype: Dict[str, _ImageInfo]
         """
         # this **must** be the region that is used for S3
-        ec2client: EC2Client = boto3.client("ec2", region_name=self._s3.bucket_region)
+        ec2client: EC2Client = _get_client("ec2", self._s3.bucket_region)
 
         # make sure the initial snapshot exists
         self._snapshot.create(ec2client, self.snapshot_name)
@@ -419,7 +444,7 @@ class Image:
 
         images: Dict[str, _ImageInfo] = dict()
         for region in self.image_regions:
-            ec2client_region: EC2Client = boto3.client("ec2", region_name=region)
+            ec2client_region: EC2Client = _get_client("ec2", region)
             image_info: Optional[_ImageInfo] = self._get(ec2client_region)
             if image_info:
                 if image_info.snapshot_id != snapshot_ids[region]:
@@ -485,7 +510,7 @@ class Image:
         # wait for the images
         logger.info(f"Waiting for {len(images)} images to be ready the regions ...")
         for region, image_info in images.items():
-            ec2client_region_wait: EC2Client = boto3.client("ec2", region_name=region)
+            ec2client_region_wait: EC2Client = _get_client("ec2", region)
             logger.info(
                 f"Waiting for {image_info.image_id} in {ec2client_region_wait.meta.region_name} "
                 "to exist/be available ..."
@@ -528,12 +553,11 @@ class Image:
         # handle marketplace publication
         if self.conf["marketplace"]:
             # the "marketplace" configuration is only valid in the "aws" partition
-            partition = boto3.client("ec2").meta.partition
+            partition = _get_client("ec2").meta.partition
             if partition == "aws":
                 logger.info(f"marketplace version request for {self.image_name}")
                 # image needs to be in us-east-1
-                ec2client: EC2Client = boto3.client("ec2", region_name="us-east-1")
-                image_info: Optional[_ImageInfo] = self._get(ec2client)
+                image_info: Optional[_ImageInfo] = self._get_cached("us-east-1")
                 if image_info:
                     im = ImageMarketplace(self._ctx, self.image_name)
                     im.request_new_version(image_info.image_id)
@@ -556,7 +580,7 @@ class Image:
         Verify (but don't modify or create anything) the image in a single region
         """
         problems: List[ImageVerificationErrors] = []
-        ec2client_region: EC2Client = boto3.client("ec2", region_name=region)
+        ec2client_region: EC2Client = _get_client("ec2", region)
         image_info: Optional[_ImageInfo] = self._get(ec2client_region)
 
         if not image_info:
@@ -2,13 +2,19 @@ import logging
 import re
 from typing import Any, Dict
 
-import boto3
 from mypy_boto3_marketplace_catalog import MarketplaceCatalogClient
 
+from awspub.common import _get_client
 from awspub.context import Context
 
 logger = logging.getLogger(__name__)
 
+# changeset names can only include alphanumeric characters, whitespace, and any combination of the following
+# characters: _+=.:@- This regex pattern takes the list of allowed characters, does a negative match on the
+# string and removes all matched (i.e. disallowed) characters. See [0] for reference.
+# [0] https://docs.aws.amazon.com/marketplace-catalog/latest/api-reference/API_StartChangeSet.html#API_StartChangeSet_RequestSyntax  # noqa
+_CHANGESET_NAME_DISALLOWED_RE = re.compile(r"[^\w\s+=.:@-]")
+
 
 class ImageMarketplace:
     """
@@ -19,7 +25,7 @@ class ImageMarketplace:
         self._ctx: Context = context
         self._image_name: str = image_name
         # marketplace-catalog API is only available via us-east-1
-        self._mpclient: MarketplaceCatalogClient = boto3.client("marketplace-catalog", region_name="us-east-1")
+        self._mpclient: MarketplaceCatalogClient = _get_client("marketplace-catalog", "us-east-1")
 
     @property
     def conf(self) -> Dict[str, Any]:
@@ -35,24 +41,24 @@ class ImageMarketplace:
         :param image_id: an image Id (in the format 'ami-123')
         :type image_id: str
         """
-        entity = self._mpclient.describe_entity(Catalog="AWSMarketplace", EntityId=self.conf["entity_id"])
+        # bind the config once instead of re-resolving the property for every access
+        conf = self.conf
+        entity = self._mpclient.describe_entity(Catalog="AWSMarketplace", EntityId=conf["entity_id"])
         # check if the version already exists
         for version in entity["DetailsDocument"]["Versions"]:
-            if version["VersionTitle"] == self.conf["version_title"]:
-                logger.info(f"Marketplace version '{self.conf['version_title']}' already exists. Do nothing")
+            if version["VersionTitle"] == conf["version_title"]:
+                logger.info(f"Marketplace version '{conf['version_title']}' already exists. Do nothing")
                 return
 
         # version doesn't exist already - create a new one
         changeset = self._request_new_version_changeset(image_id)
-        changeset_name = ImageMarketplace.sanitize_changeset_name(
-            f"New version request for {self.conf['version_title']}"
-        )
+        changeset_name = ImageMarketplace.sanitize_changeset_name(f"New version request for {conf['version_title']}")
         resp = self._mpclient.start_change_set(
             Catalog="AWSMarketplace", ChangeSet=changeset, ChangeSetTags=self._ctx.tags, ChangeSetName=changeset_name
         )
         logger.info(
-            f"new version '{self.conf['version_title']}' (image: {image_id}) for entity "
-            f"{self.conf['entity_id']} requested (changeset-id: {resp['ChangeSetId']})"
+            f"new version '{conf['version_title']}' (image: {image_id}) for entity "
+            f"{conf['entity_id']} requested (changeset-id: {resp['ChangeSetId']})"
         )
 
     def _request_new_version_changeset(self, image_id: str):
@@ -65,17 +71,19 @@ class ImageMarketplace:
         :return: A changeset structure to request a new version
         :rtype: List[Dict[str, Any]]
         """
+        # bind the config once instead of re-resolving the property for every access
+        conf = self.conf
         return [
             {
                 "ChangeType": "AddDeliveryOptions",
                 "Entity": {
-                    "Identifier": self.conf["entity_id"],
+                    "Identifier": conf["entity_id"],
                     "Type": "AmiProduct@1.0",
                 },
                 "DetailsDocument": {
                     "Version": {
-                        "VersionTitle": self.conf["version_title"],
-                        "ReleaseNotes": self.conf["release_notes"],
+                        "VersionTitle": conf["version_title"],
+                        "ReleaseNotes": conf["release_notes"],
                     },
                     "DeliveryOptions": [
                         {
@@ -83,21 +91,21 @@ class ImageMarketplace:
                                 "AmiDeliveryOptionDetails": {
                                     "AmiSource": {
                                         "AmiId": image_id,
-                                        "AccessRoleArn": self.conf["access_role_arn"],
-                                        "UserName": self.conf["user_name"],
-                                        "OperatingSystemName": self.conf["os_name"],
-                                        "OperatingSystemVersion": self.conf["os_version"],
+                                        "AccessRoleArn": conf["access_role_arn"],
+                                        "UserName": conf["user_name"],
+                                        "OperatingSystemName": conf["os_name"],
+                                        "OperatingSystemVersion": conf["os_version"],
                                     },
-                                    "UsageInstructions": self.conf["usage_instructions"],
-                                    "RecommendedInstanceType": self.conf["recommended_instance_type"],
+                                    "UsageInstructions": conf["usage_instructions"],
+                                    "RecommendedInstanceType": conf["recommended_instance_type"],
                                     "SecurityGroups": [
                                         {
                                             "IpProtocol": sg["ip_protocol"],
-                                            "IpRanges": [ipr for ipr in sg["ip_ranges"]],
+                                            "IpRanges": list(sg["ip_ranges"]),
                                             "FromPort": sg["from_port"],
                                             "ToPort": sg["to_port"],
                                         }
-                                        for sg in self.conf["security_groups"]
+                                        for sg in conf["security_groups"]
                                     ],
                                 }
                             }
@@ -109,12 +117,6 @@ class ImageMarketplace:
 
     @staticmethod
     def sanitize_changeset_name(name: str) -> str:
-        # changeset names can only include alphanumeric characters, whitespace, and any combination of the following
-        # characters: _+=.:@- This regex pattern takes the list of allowed characters, does a negative match on the
-        # string and removes all matched (i.e. disallowed) characters. See [0] for reference.
-        # [0] https://docs.aws.amazon.com/marketplace-catalog/latest/api-reference/API_StartChangeSet.html#API_StartChangeSet_RequestSyntax  # noqa
-        return re.sub(
-            "[^\\w\\s+=.:@-]",
-            "",
-            name,
-        )
+        # remove all characters that are not allowed in changeset names
+        # (see the comment on the precompiled pattern above)
+        return _CHANGESET_NAME_DISALLOWED_RE.sub("", name)
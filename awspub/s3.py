@@ -1,10 +1,20 @@
 import base64
+import concurrent.futures
+import functools
 import hashlib
+import itertools
 import logging
+import mmap
 import os
-from typing import Dict
+import queue
+import sys
+import threading
+import urllib.parse
+from typing import Dict, Iterator, List, Optional
 
 import boto3
+import botocore.config
+from botocore.exceptions import ClientError
 from mypy_boto3_s3.type_defs import CompletedPartTypeDef
 
 from awspub.context import Context
@@ -17,6 +27,131 @@ MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _get_s3client(max_pool_connections: int):
+    """
+    Get a cached S3 client so multiple S3() instances within the process don't
+    pay the client creation cost (SSL context setup, endpoint resolution) again.
+    The client reuses keep-alive connections (pool sized above the part upload
+    concurrency so parallel part uploads don't pay extra TCP/TLS handshakes) and
+    lets botocore handle S3 throttling with adaptive retries.
+    Note: urllib3 already sets TCP_NODELAY on its connections and the parts are
+    sent as single MULTIPART_CHUNK_SIZE buffers, so there is no small-write
+    batching to tune for WAN uploads here.
+
+    :param max_pool_connections: the connection pool size for the client
+    :type max_pool_connections: int
+    :return: a boto3 S3 client
+    """
+    client_config = botocore.config.Config(
+        max_pool_connections=max_pool_connections,
+        tcp_keepalive=True,
+        retries={"mode": "adaptive", "max_attempts": 10},
+    )
+    return boto3.client("s3", config=client_config)
+
+
+# hashlib.sha256 dispatches through OpenSSL (and with that uses the SHA-NI instructions
+# on modern CPUs) when the _hashlib C module is available. That makes the per-chunk
+# hashing bandwidth-bound instead of CPU-bound so warn if that module is missing
+try:
+    import _hashlib  # noqa: F401
+    import ssl
+
+    logger.debug(f"hashlib sha256 backed by OpenSSL ({ssl.OPENSSL_VERSION})")
+except ImportError:  # pragma: no cover
+    logger.warning("hashlib sha256 is not backed by OpenSSL - chunk hashing will be slower")
+
+
+# cache for head_bucket() responses keyed by bucket name (None if the bucket does not
+# exist). bucket existence and region don't change within one process run so the
+# responses are memoized for the process lifetime
+_head_bucket_cache: Dict[str, Optional[dict]] = {}
+
+
+# executor used to parallelize the per-chunk sha256 calculation. created lazily
+# and reused for the lifetime of the process so upload related methods share the same pool
+_hash_executor: Optional[concurrent.futures.Executor] = None
+
+
+def _get_hash_executor() -> concurrent.futures.Executor:
+    """
+    Get the executor used for hashing file chunks.
+    On free-threaded builds (no GIL) threads hash in parallel without the
+    process pool's per-chunk pickling overhead, otherwise a process pool
+    is used to get real parallelism.
+
+    :return: an executor for hashing file chunks
+    :rtype: concurrent.futures.Executor
+    """
+    global _hash_executor
+    if _hash_executor is None:
+        if hasattr(sys, "_is_gil_enabled") and not sys._is_gil_enabled():
+            _hash_executor = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count())
+        else:
+            _hash_executor = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _hash_executor
+
+
+def _hash_chunk(file_path: str, offset: int) -> bytes:
+    """
+    Calculate the sha256 digest for a single chunk of the given file.
+    This runs in a pool worker so the chunk is read there to avoid
+    pickling the chunk data between processes. The file is mmap'ed and
+    hashed through a memoryview slice so the chunk bytes go straight
+    from the page cache into the hash without an intermediate copy.
+
+    :param file_path: the path to the local file to hash
+    :type file_path: str
+    :param offset: the offset (in bytes) of the chunk within the file
+    :type offset: int
+    :return: the sha256 digest of the chunk
+    :rtype: bytes
+    """
+    end = offset + MULTIPART_CHUNK_SIZE
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return hashlib.sha256(memoryview(mm)[offset:end]).digest()
+
+
+def _read_chunks(file_path: str, offsets: List[int]) -> Iterator[bytes]:
+    """
+    Read MULTIPART_CHUNK_SIZE sized chunks at the given offsets with a background
+    reader thread so the next chunk is read from disk while the current one is
+    processed. The queue is bounded so at most 2 chunks are kept in memory ahead
+    of the consumer.
+
+    :param file_path: the path to the local file to read
+    :type file_path: str
+    :param offsets: the offsets (in bytes) of the chunks to read
+    :type offsets: List[int]
+    :return: an iterator over the file chunks, in offsets order
+    :rtype: Iterator[bytes]
+    """
+    chunk_queue: queue.Queue = queue.Queue(maxsize=2)
+
+    def _reader():
+        try:
+            with open(file_path, "rb") as f:
+                if hasattr(os, "posix_fadvise"):
+                    # hint the kernel to do readahead for the (mostly) sequential reads
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                for offset in offsets:
+                    f.seek(offset)
+                    chunk_queue.put(f.read(MULTIPART_CHUNK_SIZE))
+            chunk_queue.put(b"")
+        except Exception as exc:
+            chunk_queue.put(exc)
+
+    threading.Thread(target=_reader, daemon=True).start()
+    while True:
+        item = chunk_queue.get()
+        if isinstance(item, Exception):
+            raise item
+        if not item:
+            break
+        yield item
+
+
 class S3:
     """
     Handle S3 API interaction
@@ -28,7 +163,7 @@ class S3:
         "type context: awspub.context.Context
         """
         self._ctx: Context = context
-        self._s3client = boto3.client("s3")
+        self._s3client = _get_s3client(max(50, 2 * self._ctx.conf["s3"]["max_concurrent_parts"]))
         self._bucket_region = None
 
     @property
@@ -36,7 +171,9 @@ class S3:
         if not self._bucket_region:
             if not self._bucket_exists():
                 raise BucketDoesNotExistException(self.bucket_name)
-            self._bucket_region = self._s3client.head_bucket(Bucket=self.bucket_name)["BucketRegion"]
+            # usually the existence check already cached the head_bucket() response
+            head = _head_bucket_cache.get(self.bucket_name) or self._s3client.head_bucket(Bucket=self.bucket_name)
+            self._bucket_region = head["BucketRegion"]
 
         return self._bucket_region
 
@@ -50,34 +187,59 @@ class S3:
             f"region:'{self.bucket_region} key:{self._ctx.source_sha256}'>"
         )
 
-    def _multipart_sha256sum(self, file_path: str) -> str:
+    def _multipart_sha256_digests(self, file_path: str) -> List[bytes]:
         """
-        Calculate the sha256 checksum like AWS does it (in a multipart upload) per chunk
-        See https://docs.aws.amazon.com/AmazonS3/latest/userguide/checking-object-integrity.html#large-object-checksums
+        Calculate the sha256 digest for each chunk of the given file. The digests
+        are calculated once here and reused for the per-part checksums during the
+        multipart upload so the file doesn't need to be hashed twice.
 
         :param file_path: the path to the local file to upload
         :type file_path: str
+        :return: the ordered list of per-chunk sha256 digests
+        :rtype: List[bytes]
         """
-        sha256_list = []
-        count = 0
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(MULTIPART_CHUNK_SIZE), b""):
-                sha256_list.append(hashlib.sha256(chunk))
-                count += 1
+        offsets = range(0, os.path.getsize(file_path), MULTIPART_CHUNK_SIZE)
+        # executor.map() keeps the chunk order so the digests can be concatenated as-is
+        return list(_get_hash_executor().map(_hash_chunk, itertools.repeat(file_path), offsets))
 
-        sha256_list_digest_concatenated = b"".join([s.digest() for s in sha256_list])
-        sha256_b64 = base64.b64encode(hashlib.sha256(sha256_list_digest_concatenated).digest())
-        return f"{sha256_b64.decode('ascii')}-{count}"
+    @staticmethod
+    def _multipart_sha256sum(part_digests: List[bytes]) -> str:
+        """
+        Calculate the sha256 checksum like AWS does it (in a multipart upload) per chunk
+        See https://docs.aws.amazon.com/AmazonS3/latest/userguide/checking-object-integrity.html#large-object-checksums
+
+        :param part_digests: the ordered list of per-chunk sha256 digests
+        :type part_digests: List[bytes]
+        """
+        # feed the per-part digests into a single accumulator instead of materializing
+        # the concatenated digest bytes first
+        sha256_outer = hashlib.sha256()
+        for part_digest in part_digests:
+            sha256_outer.update(part_digest)
+        sha256_b64 = base64.b64encode(sha256_outer.digest())
+        return f"{sha256_b64.decode('ascii')}-{len(part_digests)}"
 
     def _bucket_exists(self) -> bool:
         """
-        Check if the S3 bucket from context exists
+        Check if the S3 bucket from context exists.
+        This uses head_bucket() which is a single constant-time API call instead
+        of listing all buckets of the account and scanning for the name. The
+        response is memoized per bucket name so repeated checks (eg. the explicit
+        check in upload_file() plus the implicit one via bucket_region) don't
+        re-hit the S3 API.
 
         :return: True if the bucket exists, otherwise False
         :rtype: bool
         """
-        resp = self._s3client.list_buckets()
-        return self.bucket_name in [b["Name"] for b in resp["Buckets"]]
+        if self.bucket_name not in _head_bucket_cache:
+            try:
+                _head_bucket_cache[self.bucket_name] = self._s3client.head_bucket(Bucket=self.bucket_name)
+            except ClientError as e:
+                if e.response["Error"]["Code"] in ("404", "NoSuchBucket", "NotFound"):
+                    _head_bucket_cache[self.bucket_name] = None
+                else:
+                    raise
+        return _head_bucket_cache[self.bucket_name] is not None
 
     def upload_file(self, source_path: str):
         """
@@ -89,6 +251,9 @@ class S3:
         Note: be aware that failed multipart uploads are not deleted. So it's recommended to setup
         a bucket lifecycle rule to delete incomplete multipart uploads.
         See https://docs.aws.amazon.com/AmazonS3/latest/userguide//mpu-abort-incomplete-mpu-lifecycle-config.html
+        Note: boto3's own transfer manager (s3client.upload_file()) is deliberately not used here.
+        It does threaded multipart uploads too but aborts the multipart upload on failure so an
+        interrupted upload can not be resumed and already uploaded parts would be lost.
 
         :param source_path: the path to the local file to upload (usually a .vmdk file)
         :type source_path: str
@@ -97,16 +262,31 @@ class S3:
         if not self._bucket_exists():
             raise BucketDoesNotExistException(self.bucket_name)
 
-        s3_sha256sum = self._multipart_sha256sum(source_path)
-
+        # check with a cheap head_object call if the key exists already in the bucket
+        # before the file gets hashed
         try:
-            # check if the key exists already in the bucket and if so, if the multipart upload
-            # sha256sum does match
             head = self._s3client.head_object(
                 Bucket=self.bucket_name, Key=self._ctx.source_sha256, ChecksumMode="ENABLED"
             )
-
-            if head["ChecksumSHA256"] == s3_sha256sum:
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("404", "NoSuchKey", "NotFound"):
+                raise
+            head = None
+            logger.debug(f"Can not find '{self._ctx.source_sha256}' in bucket '{self.bucket_name}'")
+
+        # hash the file once and reuse the digests for both the overall checksum
+        # and the per-part checksums during the upload.
+        # note: the hashing can't be folded into the upload stream itself (tee
+        # style) because the checksum decides whether to upload at all; the
+        # read/hash/upload overlap is covered by the hash pool + prefetch reader
+        part_digests = self._multipart_sha256_digests(source_path)
+        s3_sha256sum = self._multipart_sha256sum(part_digests)
+
+        if head:
+            # ChecksumSHA256 is only present if the existing object was uploaded with
+            # that checksum algorithm; anything else (older tooling, manual upload)
+            # counts as a mismatch and gets overwritten
+            if head.get("ChecksumSHA256") == s3_sha256sum:
                 logger.info(
                     f"'{self._ctx.source_sha256}' in bucket '{self.bucket_name}' "
                     "already exists and sha256sum matches. nothing to upload to S3"
@@ -117,11 +297,9 @@ class S3:
                     f"'{self._ctx.source_sha256}' in bucket '{self.bucket_name}' "
                     f"already exists but sha256sum does not match. Will be overwritten ..."
                 )
-        except Exception:
-            logging.debug(f"Can not find '{self._ctx.source_sha256}' in bucket '{self.bucket_name}'")
 
         # do the real upload
-        self._upload_file_multipart(source_path, s3_sha256sum)
+        self._upload_file_multipart(source_path, s3_sha256sum, part_digests)
 
     def _get_multipart_upload_id(self) -> str:
         """
@@ -138,12 +316,19 @@ class S3:
             logger.info(f"found existing multipart upload '{multipart_uploads[0]}' for key '{self._ctx.source_sha256}'")
             return multipart_uploads[0]
         elif len(multipart_uploads) == 0:
-            # create a new multipart upload
+            # create a new multipart upload. the tags are passed here so they are applied
+            # atomically to the final object instead of a separate put_object_tagging
+            # call after the upload completed
+            tagging = "&".join(
+                f"{urllib.parse.quote_plus(tag['Key'])}={urllib.parse.quote_plus(tag['Value'])}"
+                for tag in self._ctx.tags
+            )
             resp_create = self._s3client.create_multipart_upload(
                 Bucket=self.bucket_name,
                 Key=self._ctx.source_sha256,
                 ChecksumAlgorithm="SHA256",
                 ACL="private",
+                Tagging=tagging,
             )
             upload_id = resp_create["UploadId"]
             logger.info(
@@ -168,7 +353,46 @@ class S3:
             logger.warning("using the first found multipart upload but you should delete pending multipart uploads")
             return multipart_uploads[0]
 
-    def _upload_file_multipart(self, source_path: str, s3_sha256sum: str) -> None:
+    def _upload_one_part(
+        self, upload_id: str, part_number: int, chunk: bytes, sha256_part: str, semaphore: threading.Semaphore
+    ) -> CompletedPartTypeDef:
+        """
+        Upload a single part of a multipart upload. This runs in a worker thread
+        and releases the given semaphore once the chunk is uploaded.
+
+        :param upload_id: the multipart upload id
+        :type upload_id: str
+        :param part_number: the part number of the chunk (starting at 1)
+        :type part_number: int
+        :param chunk: the chunk data to upload
+        :type chunk: bytes
+        :param sha256_part: the base64 encoded sha256 digest of the chunk
+        :type sha256_part: str
+        :param semaphore: semaphore bounding the number of in-flight chunks
+        :type semaphore: threading.Semaphore
+        :return: the completed part usable for complete_multipart_upload()
+        :rtype: CompletedPartTypeDef
+        """
+        try:
+            resp_upload_part = self._s3client.upload_part(
+                Body=chunk,
+                Bucket=self.bucket_name,
+                ContentLength=len(chunk),
+                ChecksumAlgorithm="SHA256",
+                ChecksumSHA256=sha256_part,
+                Key=self._ctx.source_sha256,
+                PartNumber=part_number,
+                UploadId=upload_id,
+            )
+        finally:
+            semaphore.release()
+        return dict(
+            PartNumber=part_number,
+            ETag=resp_upload_part["ETag"],
+            ChecksumSHA256=sha256_part,
+        )
+
+    def _upload_file_multipart(self, source_path: str, s3_sha256sum: str, part_digests: List[bytes]) -> None:
         """
         Upload a given file to the bucket from context. The key name will be the sha256sum hexdigest of the file
 
@@ -176,6 +400,8 @@ class S3:
         :type source_path: str
         :param s3_sha256sum: the sha256sum how S3 calculates it
         :type s3_sha256sum: str
+        :param part_digests: the precomputed ordered list of per-chunk sha256 digests
+        :type part_digests: List[bytes]
         """
         upload_id = self._get_multipart_upload_id()
 
@@ -194,47 +420,57 @@ class S3:
         parts: Dict[int, CompletedPartTypeDef] = {}
         parts_size_done: int = 0
         source_path_size: int = os.path.getsize(source_path)
-        with open(source_path, "rb") as f:
-            # parts start at 1 (not 0)
-            for part_number, chunk in enumerate(iter(lambda: f.read(MULTIPART_CHUNK_SIZE), b""), start=1):
-                # the sha256sum of the current part
-                sha256_part = base64.b64encode(hashlib.sha256(chunk).digest()).decode("ascii")
-                # do nothing if that part number already exist and the sha256sum matches
-                if parts_available.get(part_number):
-                    if parts_available[part_number]["ChecksumSHA256"] == sha256_part:
-                        logger.info(f"part {part_number} already exists and sha256sum matches. continue")
-                        parts[part_number] = dict(
-                            PartNumber=part_number,
-                            ETag=parts_available[part_number]["ETag"],
-                            ChecksumSHA256=parts_available[part_number]["ChecksumSHA256"],
-                        )
-                        parts_size_done += len(chunk)
-                        continue
-                    else:
-                        logger.info(f"part {part_number} already exists but will be overwritten")
-
-                # upload a new part
-                resp_upload_part = self._s3client.upload_part(
-                    Body=chunk,
-                    Bucket=self.bucket_name,
-                    ContentLength=len(chunk),
-                    ChecksumAlgorithm="SHA256",
-                    ChecksumSHA256=sha256_part,
-                    Key=self._ctx.source_sha256,
-                    PartNumber=part_number,
-                    UploadId=upload_id,
-                )
-                parts_size_done += len(chunk)
-                # add new part to the dict of parts
-                parts[part_number] = dict(
-                    PartNumber=part_number,
-                    ETag=resp_upload_part["ETag"],
-                    ChecksumSHA256=sha256_part,
-                )
-                logger.info(
-                    f"part {part_number} uploaded ({round(parts_size_done/source_path_size * 100, 2)}% "
-                    f"; {parts_size_done} / {source_path_size} bytes)"
-                )
+        max_concurrent_parts: int = self._ctx.conf["s3"]["max_concurrent_parts"]
+        # the semaphore bounds the number of chunks held in memory while uploads are in flight
+        semaphore = threading.Semaphore(max_concurrent_parts)
+        upload_futures: Dict[concurrent.futures.Future, int] = {}
+        # the per-part checksums (precomputed when the whole file was hashed). parts start at 1 (not 0)
+        part_checksums = [base64.b64encode(part_digest).decode("ascii") for part_digest in part_digests]
+        # decide which parts actually need an upload before touching the file again.
+        # parts whose checksum matches an already available part are reused without
+        # even reading them from disk again
+        parts_to_upload: List[int] = []
+        for part_number, sha256_part in enumerate(part_checksums, start=1):
+            if parts_available.get(part_number):
+                if parts_available[part_number]["ChecksumSHA256"] == sha256_part:
+                    logger.info(f"part {part_number} already exists and sha256sum matches. continue")
+                    parts[part_number] = dict(
+                        PartNumber=part_number,
+                        ETag=parts_available[part_number]["ETag"],
+                        ChecksumSHA256=parts_available[part_number]["ChecksumSHA256"],
+                    )
+                    offset = (part_number - 1) * MULTIPART_CHUNK_SIZE
+                    parts_size_done += min(MULTIPART_CHUNK_SIZE, source_path_size - offset)
+                    continue
+                else:
+                    logger.info(f"part {part_number} already exists but will be overwritten")
+            parts_to_upload.append(part_number)
+
+        offsets = [(part_number - 1) * MULTIPART_CHUNK_SIZE for part_number in parts_to_upload]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent_parts) as executor:
+            # read only the needed chunks with a prefetch thread so the next chunk is
+            # read from disk while the current one is uploaded
+            for part_number, chunk in zip(parts_to_upload, _read_chunks(source_path, offsets)):
+                sha256_part = part_checksums[part_number - 1]
+                # upload a new part. the semaphore blocks here if too many parts are in flight
+                semaphore.acquire()
+                future = executor.submit(self._upload_one_part, upload_id, part_number, chunk, sha256_part, semaphore)
+                upload_futures[future] = len(chunk)
+
+            # progress accounting happens here in the single consumer thread (not in a
+            # per-callback hook in the upload workers) so it stays lock-free and cheap
+            for future in concurrent.futures.as_completed(upload_futures):
+                part = future.result()
+                parts[part["PartNumber"]] = part
+                parts_size_done += upload_futures[future]
+                # integer percentage and a level guard so suppressed logs don't pay
+                # for the string formatting
+                if logger.isEnabledFor(logging.INFO):
+                    pct = parts_size_done * 100 // source_path_size
+                    logger.info(
+                        f"part {part['PartNumber']} uploaded ({pct}% "
+                        f"; {parts_size_done} / {source_path_size} bytes)"
+                    )
 
         logger.info(
             f"finishing the multipart upload for key '{self._ctx.source_sha256}' in bucket {self.bucket_name} now ..."
@@ -245,18 +481,9 @@ class S3:
             Key=self._ctx.source_sha256,
             UploadId=upload_id,
             ChecksumSHA256=s3_sha256sum,
-            MultipartUpload={"Parts": [value for key, value in parts.items()]},
+            MultipartUpload={"Parts": [parts[part_number] for part_number in sorted(parts)]},
         )
         logger.info(
             f"multipart upload finished and key '{self._ctx.source_sha256}' now "
             f"available in bucket '{self.bucket_name}'"
         )
-
-        # add tagging to the final s3 object
-        self._s3client.put_object_tagging(
-            Bucket=self.bucket_name,
-            Key=self._ctx.source_sha256,
-            Tagging={
-                "TagSet": self._ctx.tags,
-            },
-        )
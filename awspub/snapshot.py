@@ -1,15 +1,45 @@
+import concurrent.futures
 import logging
-from typing import Dict, List, Optional
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 
-import boto3
 from mypy_boto3_ec2.client import EC2Client
 
 from awspub import exceptions
+from awspub.common import _get_client
 from awspub.context import Context
 
 logger = logging.getLogger(__name__)
 
 
+def _poll_until(check: Callable[[], bool], description: str, max_delay: float = 30, timeout: float = 2700) -> None:
+    """
+    Poll the given check with exponential backoff (starting at 2 seconds, doubling
+    up to max_delay) until it returns True.
+    The stock boto3 waiters poll with a fixed 30 second delay which wastes up to
+    30 seconds after the operation actually finished; starting small and backing
+    off notices quick operations early without hammering the API on long ones.
+
+    :param check: a callable returning True once the waited-for condition holds
+    :type check: Callable[[], bool]
+    :param description: description of the waited-for condition (used for errors)
+    :type description: str
+    :param max_delay: the maximum delay (in seconds) between two checks
+    :type max_delay: float
+    :param timeout: the overall time (in seconds) to wait before giving up
+    :type timeout: float
+    :raises exceptions.SnapshotWaitException: if the timeout is reached
+    """
+    delay: float = 2
+    waited: float = 0
+    while not check():
+        if waited >= timeout:
+            raise exceptions.SnapshotWaitException(f"timed out after {round(waited)}s waiting for {description}")
+        time.sleep(delay)
+        waited += delay
+        delay = min(max_delay, delay * 2)
+
+
 class Snapshot:
     """
     Handle EC2 Snapshot API interaction
@@ -29,7 +59,10 @@ class Snapshot:
         :return: Either None or a snapshot-id
         :rtype: Optional[str]
         """
-        resp = ec2client.describe_snapshots(
+        # only the distinction 0 / 1 / more-than-1 matters here so stop paginating
+        # after two matches instead of materializing every matching snapshot
+        paginator = ec2client.get_paginator("describe_snapshots")
+        pages = paginator.paginate(
             Filters=[
                 {
                     "Name": "tag:Name",
@@ -46,15 +79,23 @@ class Snapshot:
                 },
             ],
             OwnerIds=["self"],
+            # PageSize=5 is the smallest page the API allows - the 0/1/many decision
+            # never needs more data than that on the wire
+            PaginationConfig={"MaxItems": 2, "PageSize": 5},
         )
-        if len(resp.get("Snapshots", [])) == 1:
-            return resp["Snapshots"][0]["SnapshotId"]
-        elif len(resp.get("Snapshots", [])) == 0:
+        snapshots: List = []
+        for page in pages:
+            snapshots.extend(page.get("Snapshots", []))
+            if len(snapshots) >= 2:
+                break
+        count = len(snapshots)
+        if count == 1:
+            return snapshots[0]["SnapshotId"]
+        elif count == 0:
             return None
         else:
             raise exceptions.MultipleSnapshotsException(
-                f"Found {len(resp.get('Snapshots', []))} snapshots with "
-                f"name '{snapshot_name}' in region {ec2client.meta.region_name}"
+                f"Found multiple snapshots with " f"name '{snapshot_name}' in region {ec2client.meta.region_name}"
             )
 
     def _get_import_snapshot_task(self, ec2client: EC2Client, snapshot_name: str) -> Optional[str]:
@@ -78,21 +119,30 @@ class Snapshot:
                 }
             ]
         )
-        # API doesn't support filters by status so filter here
+        # the DescribeImportSnapshotTasks API only supports tag filters, not a status
+        # filter, so the status filtering has to stay client-side
         tasks: List = resp.get("ImportSnapshotTasks", [])
         # we already know here that the snapshot does not exist (checked in create() before calling this
         # function). so ignore "deleted" or "completed" tasks here
         # it might happen (for whatever reason) that a task got completed but the snapshot got deleted
         # afterwards. In that case a "completed" task for the given snapshot_name exists but
         # that doesn't help so ignore it
-        tasks = [t for t in tasks if t["SnapshotTaskDetail"]["Status"] not in ["deleted", "completed"]]
-        if len(tasks) == 1:
-            return tasks[0]["ImportTaskId"]
-        elif len(tasks) == 0:
+        inactive_states = {"deleted", "completed"}
+        active_tasks: List = []
+        for task in tasks:
+            if task["SnapshotTaskDetail"]["Status"] not in inactive_states:
+                active_tasks.append(task)
+                if len(active_tasks) > 1:
+                    # more than one active task is already an error - stop scanning
+                    break
+        count = len(active_tasks)
+        if count == 1:
+            return active_tasks[0]["ImportTaskId"]
+        elif count == 0:
             return None
         else:
             raise exceptions.MultipleImportSnapshotTasksException(
-                f"Found {len(tasks)} import snapshot tasks with "
+                f"Found multiple import snapshot tasks with "
                 f"name '{snapshot_name}' in region {ec2client.meta.region_name}"
             )
 
@@ -100,6 +150,11 @@ class Snapshot:
         """
         Create a EC2 snapshot with the given name
         If the snapshot already exists, just return the snapshot-id for the existing snapshot.
+        Note: this check is content-addressed already: the snapshot name is the sha256sum
+        of the source file (possibly combined with the separate-snapshot/billing-products
+        markers, see Image.snapshot_name) and the snapshot carries the source sha256 in
+        the awspub:source:sha256 tag. A lookup purely by source sha256 would wrongly
+        merge snapshots that intentionally differ (eg. separate_snapshot images).
 
         :param ec2client: EC2 client for a specific region
         :type ec2client: EC2Client
@@ -119,9 +174,8 @@ class Snapshot:
             f"for '{snapshot_name}' in region  {ec2client.meta.region_name}"
         )
 
-        # extend tags
-        tags = self._ctx.tags
-        tags.append({"Key": "Name", "Value": snapshot_name})
+        # extend tags (as a new list so the shared context tags are not mutated)
+        tags = [*self._ctx.tags, {"Key": "Name", "Value": snapshot_name}]
 
         # does a import snapshot task with the given name already exist?
         import_snapshot_task_id: Optional[str] = self._get_import_snapshot_task(ec2client, snapshot_name)
@@ -152,22 +206,38 @@ class Snapshot:
             f"in region {ec2client.meta.region_name} ..."
         )
 
-        waiter_import = ec2client.get_waiter("snapshot_imported")
-        waiter_import.wait(ImportTaskIds=[import_snapshot_task_id], WaiterConfig={"Delay": 30, "MaxAttempts": 90})
+        def _import_done() -> bool:
+            resp_tasks = ec2client.describe_import_snapshot_tasks(ImportTaskIds=[import_snapshot_task_id])
+            status = resp_tasks["ImportSnapshotTasks"][0]["SnapshotTaskDetail"]["Status"]
+            if status in ("deleted", "deleting", "error"):
+                raise exceptions.SnapshotWaitException(
+                    f"import snapshot task {import_snapshot_task_id} in unexpected status '{status}'"
+                )
+            return status == "completed"
+
+        _poll_until(_import_done, f"import snapshot task {import_snapshot_task_id}", timeout=2700)
 
         task_details = ec2client.describe_import_snapshot_tasks(ImportTaskIds=[import_snapshot_task_id])
         snapshot_id = task_details["ImportSnapshotTasks"][0]["SnapshotTaskDetail"]["SnapshotId"]
 
-        # create tags before waiting for completion so the tags are already there
+        # create tags before waiting for completion so the tags are already there.
+        # this extra call can not be folded into import_snapshot: its
+        # TagSpecifications only accept the import-snapshot-task resource type,
+        # the snapshot itself only exists after the import task finished
         ec2client.create_tags(Resources=[snapshot_id], Tags=tags)
 
-        waiter_completed = ec2client.get_waiter("snapshot_completed")
-        waiter_completed.wait(SnapshotIds=[snapshot_id], WaiterConfig={"Delay": 30, "MaxAttempts": 60})
+        _poll_until(
+            lambda: self._snapshots_completed(ec2client, [snapshot_id]),
+            f"snapshot {snapshot_id}",
+            timeout=1800,
+        )
 
         logger.info(f"Snapshot import as '{snapshot_id}' in region {ec2client.meta.region_name} done")
         return snapshot_id
 
-    def _copy(self, snapshot_name: str, source_region: str, destination_region: str) -> str:
+    def _copy(
+        self, snapshot_name: str, source_region: str, destination_region: str, source_snapshot_id: Optional[str]
+    ) -> Tuple[str, bool]:
         """
         Copy a EC2 snapshot for the given context to the destination region
         NOTE: we don't wait for the snapshot to complete here!
@@ -178,33 +248,30 @@ class Snapshot:
         :type source_region: str
         :param destination_region: a region to copy the snapshot to
         :type destionation_region: str
+        :param source_snapshot_id: the snapshot-id in the source region (resolved once
+            in copy() for all destination regions) or None if it does not exist
+        :type source_snapshot_id: Optional[str]
 
-        :return: the existing or created snapshot-id
-        :rtype: str
+        :return: the existing or created snapshot-id and True if the snapshot already existed
+        :rtype: Tuple[str, bool]
         """
 
         # does the snapshot with that name already exist in the destination region?
-        ec2client_dest: EC2Client = boto3.client("ec2", region_name=destination_region)
+        ec2client_dest: EC2Client = _get_client("ec2", destination_region)
         snapshot_id: Optional[str] = self._get(ec2client_dest, snapshot_name)
         if snapshot_id:
             logger.info(
                 f"snapshot with name '{snapshot_name}' already "
                 f"exists ({snapshot_id}) in destination region {ec2client_dest.meta.region_name}"
             )
-            return snapshot_id
+            return snapshot_id, True
 
-        ec2client_source: EC2Client = boto3.client("ec2", region_name=source_region)
-        source_snapshot_id: Optional[str] = self._get(ec2client_source, snapshot_name)
         if not source_snapshot_id:
-            raise ValueError(
-                f"Can not find source snapshot with name '{snapshot_name}' "
-                f"in region {ec2client_source.meta.region_name}"
-            )
+            raise ValueError(f"Can not find source snapshot with name '{snapshot_name}' " f"in region {source_region}")
 
         logger.info(f"Copy snapshot {source_snapshot_id} from " f"{source_region} to {destination_region}")
-        # extend tags
-        tags = self._ctx.tags
-        tags.append({"Key": "Name", "Value": snapshot_name})
+        # extend tags (as a new list so the shared context tags are not mutated)
+        tags = [*self._ctx.tags, {"Key": "Name", "Value": snapshot_name}]
         resp = ec2client_dest.copy_snapshot(
             SourceRegion=source_region,
             SourceSnapshotId=source_snapshot_id,
@@ -212,7 +279,7 @@ class Snapshot:
         )
 
         # note: we don't wait for the snapshot to complete here!
-        return resp["SnapshotId"]
+        return resp["SnapshotId"], False
 
     def copy(self, snapshot_name: str, source_region: str, destination_regions: List[str]) -> Dict[str, str]:
         """
@@ -228,14 +295,73 @@ class Snapshot:
         :rtype: Dict[str, str] where the key is a region name and the value a snapshot-id
         """
         snapshot_ids: Dict[str, str] = dict()
-        for destination_region in destination_regions:
-            snapshot_ids[destination_region] = self._copy(snapshot_name, source_region, destination_region)
-
-        logger.info(f"Waiting for {len(snapshot_ids)} snapshots to appear in the destination regions ...")
-        for destination_region, snapshot_id in snapshot_ids.items():
-            ec2client_dest = boto3.client("ec2", region_name=destination_region)
-            waiter = ec2client_dest.get_waiter("snapshot_completed")
-            logger.info(f"Waiting for {snapshot_id} in {ec2client_dest.meta.region_name} to complete ...")
-            waiter.wait(SnapshotIds=[snapshot_id], WaiterConfig={"Delay": 30, "MaxAttempts": 90})
+        # resolve the source snapshot id once instead of once per destination region.
+        # destination regions that already have the snapshot don't need it at all
+        source_snapshot_id: Optional[str] = self._get(_get_client("ec2", source_region), snapshot_name)
+        # the copies are independent per destination region so fan them out to a
+        # thread pool. the copy itself and the waiting are network-bound
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, max(1, len(destination_regions)))) as executor:
+            copy_futures = {
+                executor.submit(
+                    self._copy, snapshot_name, source_region, destination_region, source_snapshot_id
+                ): destination_region
+                for destination_region in destination_regions
+            }
+            # only wait for snapshots a copy was actually started for. snapshots that
+            # already existed in the destination region completed earlier (or belong to
+            # another in-flight run which does its own waiting). group by region so
+            # each region gets a single poll loop covering all its snapshots
+            snapshots_to_wait_for: Dict[str, List[str]] = {}
+            for future in concurrent.futures.as_completed(copy_futures):
+                destination_region = copy_futures[future]
+                snapshot_id, was_existing = future.result()
+                snapshot_ids[destination_region] = snapshot_id
+                if not was_existing:
+                    snapshots_to_wait_for.setdefault(destination_region, []).append(snapshot_id)
+
+            logger.info(f"Waiting for {len(snapshots_to_wait_for)} snapshots to appear in the destination regions ...")
+            wait_futures = [
+                executor.submit(self._wait_for_completion, destination_region, region_snapshot_ids)
+                for destination_region, region_snapshot_ids in snapshots_to_wait_for.items()
+            ]
+            for wait_future in concurrent.futures.as_completed(wait_futures):
+                wait_future.result()
 
         return snapshot_ids
+
+    def _snapshots_completed(self, ec2client: EC2Client, snapshot_ids: List[str]) -> bool:
+        """
+        Check if all given snapshots are completed
+
+        :param ec2client: EC2 client for a specific region
+        :type ec2client: EC2Client
+        :param snapshot_ids: the snapshot-ids to check
+        :type snapshot_ids: List[str]
+        :return: True if all given snapshots are completed, otherwise False
+        :rtype: bool
+        :raises exceptions.SnapshotWaitException: if a snapshot is in error state
+        """
+        resp = ec2client.describe_snapshots(SnapshotIds=snapshot_ids)
+        for snap in resp["Snapshots"]:
+            if snap.get("State") == "error":
+                raise exceptions.SnapshotWaitException(f"snapshot {snap.get('SnapshotId')} in error state")
+        return all(snap.get("State") == "completed" for snap in resp["Snapshots"])
+
+    def _wait_for_completion(self, region: str, snapshot_ids: List[str]) -> None:
+        """
+        Wait for the given snapshots to be completed in the given region.
+        All snapshots of the region are covered by a single describe_snapshots
+        poll loop instead of one polling session per snapshot.
+
+        :param region: the region name the snapshots live in
+        :type region: str
+        :param snapshot_ids: the snapshot-ids to wait for
+        :type snapshot_ids: List[str]
+        """
+        ec2client_dest: EC2Client = _get_client("ec2", region)
+        logger.info(f"Waiting for {snapshot_ids} in {region} to complete ...")
+        _poll_until(
+            lambda: self._snapshots_completed(ec2client_dest, snapshot_ids),
+            f"snapshots {snapshot_ids} in region {region}",
+            timeout=2700,
+        )
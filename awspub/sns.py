@@ -2,16 +2,17 @@
 Methods used to handle notifications for AWS using SNS
 """
 
+import concurrent.futures
+import functools
 import json
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
-import boto3
 from botocore.exceptions import ClientError
 from mypy_boto3_sns.client import SNSClient
 from mypy_boto3_sts.client import STSClient
 
-from awspub.common import _get_regions
+from awspub.common import _get_client, _get_regions
 from awspub.context import Context
 from awspub.exceptions import AWSAuthorizationException, AWSNotificationException
 from awspub.s3 import S3
@@ -19,6 +20,23 @@ from awspub.s3 import S3
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _caller_identity(region_name: str) -> Tuple[str, str]:
+    """
+    Get account and partition for the current caller identity.
+    Both are invariant for the process lifetime so the STS call is memoized.
+
+    :param region_name: name of region
+    :type region_name: str
+    :return: account and partition of the caller identity
+    :rtype: Tuple[str, str]
+    """
+    stsclient: STSClient = _get_client("sts", region_name)
+    resp = stsclient.get_caller_identity()
+    # resp["Arn"] has string format "arn:partition:iam::accountnumber:user/iam_role"
+    return resp["Account"], resp["Arn"].rsplit(":")[1]
+
+
 class SNSNotification(object):
     """
     A data object that contains validation logic and
@@ -32,6 +50,9 @@ class SNSNotification(object):
         self._ctx: Context = context
         self._image_name: str = image_name
         self._s3: S3 = S3(context)
+        # cache for _sns_regions() keyed by the configured region tuple (topics
+        # often share the same region configuration)
+        self._sns_regions_cache: Dict[Tuple[str, ...], List[str]] = {}
 
     @property
     def conf(self) -> List[Dict[str, Any]]:
@@ -49,10 +70,11 @@ class SNSNotification(object):
         partition doesn't include us-east-1 here).
         """
 
-        regions_configured = topic_config["regions"] if "regions" in topic_config else []
-        sns_regions = _get_regions(self._s3.bucket_region, regions_configured)
+        regions_configured = tuple(topic_config.get("regions") or ())
+        if regions_configured not in self._sns_regions_cache:
+            self._sns_regions_cache[regions_configured] = _get_regions(self._s3.bucket_region, list(regions_configured))
 
-        return sns_regions
+        return self._sns_regions_cache[regions_configured]
 
     def _get_topic_arn(self, topic_name: str, region_name: str) -> str:
         """
@@ -65,12 +87,7 @@ class SNSNotification(object):
         :rtype: str
         """
 
-        stsclient: STSClient = boto3.client("sts", region_name=region_name)
-        resp = stsclient.get_caller_identity()
-
-        account = resp["Account"]
-        # resp["Arn"] has string format "arn:partition:iam::accountnumber:user/iam_role"
-        partition = resp["Arn"].rsplit(":")[1]
+        account, partition = _caller_identity(region_name)
 
         return f"arn:{partition}:sns:{region_name}:{account}:{topic_name}"
 
@@ -79,27 +96,75 @@ class SNSNotification(object):
         send notification to subscribers
         """
 
+        # resolve the loop-invariant pieces (regions per topic, the serialized message
+        # and topic ARNs based on the memoized caller identity) once before publishing
+        publish_targets: List[Tuple[str, str, str, str, str]] = []
         for topic in self.conf:
             for topic_name, topic_config in topic.items():
+                # serialize the message once per topic instead of once per region
+                message = json.dumps(topic_config["message"])
                 for region_name in self._sns_regions(topic_config):
-                    snsclient: SNSClient = boto3.client("sns", region_name=region_name)
-                    try:
-                        snsclient.publish(
-                            TopicArn=self._get_topic_arn(topic_name, region_name),
-                            Subject=topic_config["subject"],
-                            Message=json.dumps(topic_config["message"]),
-                            MessageStructure="json",
+                    publish_targets.append(
+                        (
+                            topic_name,
+                            topic_config["subject"],
+                            message,
+                            region_name,
+                            self._get_topic_arn(topic_name, region_name),
                         )
-                    except ClientError as e:
-                        exception_code: str = e.response["Error"]["Code"]
-                        if exception_code == "AuthorizationError":
-                            raise AWSAuthorizationException(
-                                "Profile does not have a permission to send the SNS notification."
-                                " Please review the policy."
-                            )
-                        else:
-                            raise AWSNotificationException(str(e))
-                    logger.info(
-                        f"The SNS notification {topic_config['subject']}"
-                        f" for the topic {topic_name} in {region_name} has been sent."
                     )
+
+        # the publishes are small independent HTTPS calls so fan them out to a
+        # thread pool instead of walking the topics x regions product serially
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(16, max(1, len(publish_targets)))) as executor:
+            futures = [executor.submit(self._publish_one, *publish_target) for publish_target in publish_targets]
+            errors: List[Exception] = []
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as exc:
+                    errors.append(exc)
+
+        if errors:
+            # a permission problem concerns all targets so surface it directly
+            for error in errors:
+                if isinstance(error, AWSAuthorizationException):
+                    raise error
+            if len(errors) == 1:
+                raise errors[0]
+            # aggregate the remaining errors so partial success is visible
+            raise AWSNotificationException("; ".join(str(error) for error in errors))
+
+    def _publish_one(self, topic_name: str, subject: str, message: str, region_name: str, topic_arn: str) -> None:
+        """
+        Send a single notification for the given topic in the given region.
+        This runs in a worker thread during publish().
+
+        :param topic_name: Name of topic
+        :type topic_name: str
+        :param subject: the notification subject
+        :type subject: str
+        :param message: the JSON-serialized, protocol-keyed notification message
+        :type message: str
+        :param region_name: name of region
+        :type region_name: str
+        :param topic_arn: the topic ARN to publish to
+        :type topic_arn: str
+        """
+        snsclient: SNSClient = _get_client("sns", region_name)
+        try:
+            snsclient.publish(
+                TopicArn=topic_arn,
+                Subject=subject,
+                Message=message,
+                MessageStructure="json",
+            )
+        except ClientError as e:
+            exception_code: str = e.response["Error"]["Code"]
+            if exception_code == "AuthorizationError":
+                raise AWSAuthorizationException(
+                    "Profile does not have a permission to send the SNS notification." " Please review the policy."
+                )
+            else:
+                raise AWSNotificationException(str(e))
+        logger.info(f"The SNS notification {subject}" f" for the topic {topic_name} in {region_name} has been sent.")
@@ -0,0 +1,61 @@
+import pathlib
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from awspub import common, context, s3, sns
+
+
+@pytest.fixture(autouse=True)
+def clear_boto3_client_caches():
+    """
+    boto3 clients are cached at module scope for the process lifetime.
+    The tests patch boto3.client so make sure every test starts with
+    empty client caches.
+    """
+    common._get_client.cache_clear()
+    common._get_region_names.cache_clear()
+    s3._get_s3client.cache_clear()
+    s3._head_bucket_cache.clear()
+    sns._caller_identity.cache_clear()
+    yield
+
+
+curdir = pathlib.Path(__file__).parent.resolve()
+
+
+@pytest.fixture(scope="session")
+def ctx_config1():
+    """
+    A session wide Context for fixtures/config1.yaml.
+    A Context is read-only after construction so the tests share a single
+    instance instead of rebuilding it (config parse + source sha256) per test.
+    """
+    return context.Context(curdir / "fixtures/config1.yaml", None)
+
+
+@pytest.fixture
+def boto3_client_mock(monkeypatch):
+    """
+    A single MagicMock client installed behind boto3.client.
+    Cheaper than a fresh patch("boto3.client") context manager per test and
+    the tests only need to set the response payloads on the returned mock.
+    """
+    client = MagicMock()
+    # canned defaults that most tests need; individual tests override as needed
+    client.describe_regions.return_value = {"Regions": [{"RegionName": "eu-central-1"}, {"RegionName": "us-east-1"}]}
+    client.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
+    monkeypatch.setattr("boto3.client", lambda *args, **kwargs: client)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def fast_sleep(monkeypatch):
+    """
+    The snapshot wait helpers poll with time.sleep between checks. No test
+    should ever really sleep, so make it a no-op suite-wide (the stock boto3
+    waiters were replaced by those poll helpers, so there is nothing else to
+    patch).
+    """
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
@@ -1,4 +1,3 @@
-import glob
 import os
 import pathlib
 
@@ -33,6 +32,15 @@ def test_context_create_minimal():
     assert ctx.conf["s3"]["bucket_name"] == "bucket1"
 
 
+def test_context_create_with_source_sha256():
+    """
+    Create a Context object with a pre-computed source sha256 - the source
+    file must not be hashed in that case
+    """
+    ctx = context.Context(curdir / "fixtures/config1.yaml", None, source_sha256="custom-digest")
+    assert ctx.source_sha256 == "custom-digest"
+
+
 def test_context_create_with_mapping():
     """
     Create a Context object from a given configuration
@@ -49,13 +57,13 @@ def test_context_with_docs_config_samples():
     Create a Context object with the sample config files used for documentation
     """
     config_samples_dir = curdir.parents[1] / "docs" / "config-samples"
-    for f in glob.glob(f"{config_samples_dir}/*.yaml"):
-        mapping_file = f + ".mapping"
-        if os.path.exists(mapping_file):
-            mapping = mapping_file
-        else:
-            mapping = None
-        context.Context(os.path.join(config_samples_dir, f), mapping)
+    # one scandir pass instead of a glob plus a stat per mapping file
+    entries = {entry.name: entry for entry in os.scandir(config_samples_dir)}
+    for name, entry in entries.items():
+        if not name.endswith(".yaml"):
+            continue
+        mapping = entries.get(f"{name}.mapping")
+        context.Context(entry.path, mapping.path if mapping else None)
 
 
 def test_context_with_duplicate_image_name():
@@ -8,9 +8,43 @@ from awspub import context, exceptions, image
 curdir = pathlib.Path(__file__).parent.resolve()
 
 
+def _describe_images_payload(name, image_id, snapshot_id):
+    """
+    The canonical describe_images response (one image with an EBS root device)
+    shared by several tests
+    """
+    return {
+        "Images": [
+            {
+                "Name": name,
+                "ImageId": image_id,
+                "RootDeviceName": "/dev/sda1",
+                "BlockDeviceMappings": [
+                    {
+                        "DeviceName": "/dev/sda1",
+                        "Ebs": {
+                            "DeleteOnTermination": True,
+                            "SnapshotId": snapshot_id,
+                        },
+                    },
+                ],
+            }
+        ]
+    }
+
+
+@pytest.fixture
+def img(request, ctx_config1):
+    """
+    An Image built from the session context; parametrize indirectly with the
+    image name so the instance is constructed once per parameter set
+    """
+    return image.Image(ctx_config1, request.param)
+
+
 @pytest.mark.parametrize(
-    "imagename,snapshotname",
-    [
+    "img,snapshotname",
+    (
         # test-image-1 without any separate snapshot or billing products.
         # so snapshotname should match source sha256sum
         ("test-image-1", "6252475408b9f9ee64452b611d706a078831a99b123db69d144d878a0488a0a8"),
@@ -25,23 +59,22 @@ curdir = pathlib.Path(__file__).parent.resolve()
         ("test-image-4", "bf795c602d53ff9c9548cc6305aa1240bd0f3d4429869abe4c96bcef65c4e48d"),
         # test-image-5 without separate snapshot but with multiple billing products
         ("test-image-5", "8171cd4d36d06150a5ff8bb519439c5efd4e91841be62f50736db3b82e4aaedc"),
-    ],
+    ),
+    indirect=["img"],
 )
-def test_snapshot_names(imagename, snapshotname):
+def test_snapshot_names(img, snapshotname, ctx_config1):
     """
     Test the snapshot name calculation based on the image properties
     """
-    ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-    assert ctx.conf["source"]["path"] == curdir / "fixtures/config1.vmdk"
-    assert ctx.source_sha256 == "6252475408b9f9ee64452b611d706a078831a99b123db69d144d878a0488a0a8"
+    assert ctx_config1.conf["source"]["path"] == curdir / "fixtures/config1.vmdk"
+    assert ctx_config1.source_sha256 == "6252475408b9f9ee64452b611d706a078831a99b123db69d144d878a0488a0a8"
 
-    img = image.Image(ctx, imagename)
     assert img.snapshot_name == snapshotname
 
 
 @pytest.mark.parametrize(
     "imagename,regions_in_partition,regions_expected",
-    [
+    (
         # test-image-1 has 2 regions defined
         ("test-image-1", ["region1", "region2"], ["region1", "region2"]),
         # test-image-1 has 2 regions defined and there are more regions in the partition
@@ -55,46 +88,46 @@ def test_snapshot_names(imagename, snapshotname):
         ("test-image-1", ["region2", "region4"], ["region2"]),
         # test-image-2 has no regions defined and the ec2 client doesn't return any regions
         ("test-image-2", [], []),
-    ],
+    ),
 )
 @patch("awspub.s3.S3.bucket_region", return_value="region1")
-def test_image_regions(s3_region_mock, imagename, regions_in_partition, regions_expected):
+def test_image_regions(
+    s3_region_mock, imagename, regions_in_partition, regions_expected, boto3_client_mock, ctx_config1
+):
     """
     Test the regions for a given image
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_regions.return_value = {"Regions": [{"RegionName": r} for r in regions_in_partition]}
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image.Image(ctx, imagename)
-        assert sorted(img.image_regions) == sorted(regions_expected)
+    instance = boto3_client_mock
+    instance.describe_regions.return_value = {"Regions": [{"RegionName": r} for r in regions_in_partition]}
+    ctx = ctx_config1
+    img = image.Image(ctx, imagename)
+    # order-insensitive comparison without the two Timsort passes
+    assert set(img.image_regions) == set(regions_expected)
 
 
 @pytest.mark.parametrize(
     "imagename,cleanup",
-    [
+    (
         ("test-image-1", True),
         ("test-image-2", False),
-    ],
+    ),
 )
-def test_image_cleanup(imagename, cleanup):
+def test_image_cleanup(imagename, cleanup, boto3_client_mock, ctx_config1):
     """
     Test the cleanup for a given image
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_images.return_value = {"Images": [{"Name": imagename, "Public": False, "ImageId": "ami-123"}]}
-        instance.describe_regions.return_value = {"Regions": [{"RegionName": "region1"}, {"RegionName": "region2"}]}
-        instance.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image.Image(ctx, imagename)
-        img.cleanup()
-        assert instance.deregister_image.called == cleanup
+    instance = boto3_client_mock
+    instance.describe_images.return_value = {"Images": [{"Name": imagename, "Public": False, "ImageId": "ami-123"}]}
+    instance.describe_regions.return_value = {"Regions": [{"RegionName": "region1"}, {"RegionName": "region2"}]}
+    ctx = ctx_config1
+    img = image.Image(ctx, imagename)
+    img.cleanup()
+    assert instance.deregister_image.called == cleanup
 
 
 @pytest.mark.parametrize(
     "root_device_name,block_device_mappings,snapshot_id",
-    [
+    (
         ("", [], None),
         ("/dev/sda1", [], None),
         (
@@ -114,14 +147,14 @@ def test_image_cleanup(imagename, cleanup):
             ],
             "snap-0be0763f84af34e05",
         ),
-    ],
+    ),
 )
-def test_image___get_root_device_snapshot_id(root_device_name, block_device_mappings, snapshot_id):
+def test_image___get_root_device_snapshot_id(root_device_name, block_device_mappings, snapshot_id, ctx_config1):
     """
     Test the _get_root_device_snapshot_id() method
     """
     i = {"RootDeviceName": root_device_name, "BlockDeviceMappings": block_device_mappings}
-    ctx = context.Context(curdir / "fixtures/config1.yaml", None)
+    ctx = ctx_config1
     img = image.Image(ctx, "test-image-1")
     assert img._get_root_device_snapshot_id(i) == snapshot_id
 
@@ -136,7 +169,7 @@ def test_image___get_root_device_snapshot_id(root_device_name, block_device_mapp
         "called_put_parameter",
         "called_sns_publish",
     ),
-    [
+    (
         ("test-image-6", "aws", True, True, False, False, False),
         ("test-image-7", "aws", False, False, False, False, False),
         ("test-image-8", "aws", True, True, True, True, False),
@@ -144,7 +177,9 @@ def test_image___get_root_device_snapshot_id(root_device_name, block_device_mapp
         ("test-image-10", "aws", False, False, False, False, True),
         ("test-image-11", "aws", False, False, False, False, True),
         ("test-image-12", "aws", False, False, False, False, True),
-    ],
+    ),
+    # short explicit ids so pytest doesn't repr the parameter tuples at collection
+    ids=["img6-public", "img7-private", "img8-marketplace", "img8-aws-cn", "img10-sns", "img11-sns", "img12-sns"],
 )
 def test_image_publish(
     imagename,
@@ -154,232 +189,165 @@ def test_image_publish(
     called_start_change_set,
     called_put_parameter,
     called_sns_publish,
+    boto3_client_mock,
+    ctx_config1,
 ):
     """
     Test the publish() for a given image
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.meta.partition = partition
-        instance.describe_images.return_value = {
-            "Images": [
-                {
-                    "Name": imagename,
-                    "ImageId": "ami-abc",
-                    "RootDeviceName": "/dev/sda1",
-                    "BlockDeviceMappings": [
-                        {
-                            "DeviceName": "/dev/sda1",
-                            "Ebs": {
-                                "DeleteOnTermination": True,
-                                "SnapshotId": "snap-0be0763f84af34e05",
-                            },
-                        },
-                    ],
-                }
-            ]
-        }
-        instance.get_parameters.return_value = {"Parameters": []}
-        instance.describe_regions.return_value = {
-            "Regions": [{"RegionName": "eu-central-1"}, {"RegionName": "us-east-1"}]
-        }
-        instance.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image.Image(ctx, imagename)
-        img.publish()
-        assert instance.modify_image_attribute.called == called_mod_image
-        assert instance.modify_snapshot_attribute.called == called_mod_snapshot
-        assert instance.start_change_set.called == called_start_change_set
-        assert instance.put_parameter.called == called_put_parameter
-        assert instance.publish.called == called_sns_publish
-
-
-def test_image__get_zero_images():
+    instance = boto3_client_mock
+    instance.meta.partition = partition
+    instance.describe_images.return_value = _describe_images_payload(imagename, "ami-abc", "snap-0be0763f84af34e05")
+    instance.get_parameters.return_value = {"Parameters": []}
+    ctx = ctx_config1
+    img = image.Image(ctx, imagename)
+    img.publish()
+    assert instance.modify_image_attribute.called == called_mod_image
+    assert instance.modify_snapshot_attribute.called == called_mod_snapshot
+    assert instance.start_change_set.called == called_start_change_set
+    assert instance.put_parameter.called == called_put_parameter
+    assert instance.publish.called == called_sns_publish
+
+
+def test_image__get_zero_images(boto3_client_mock, ctx_config1):
     """
     Test the Image._get() method with zero matching image
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_images.return_value = {"Images": []}
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image.Image(ctx, "test-image-1")
-        assert img._get(instance) is None
+    instance = boto3_client_mock
+    instance.describe_images.return_value = {"Images": []}
+    ctx = ctx_config1
+    img = image.Image(ctx, "test-image-1")
+    assert img._get(instance) is None
 
 
-def test_image__get_one_images():
+def test_image__get_one_images(boto3_client_mock, ctx_config1):
     """
     Test the Image._get() method with a single matching image
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_images.return_value = {
-            "Images": [
-                {
-                    "Name": "test-image-1",
-                    "ImageId": "ami-abc",
-                    "RootDeviceName": "/dev/sda1",
-                    "BlockDeviceMappings": [
-                        {
-                            "DeviceName": "/dev/sda1",
-                            "Ebs": {
-                                "DeleteOnTermination": True,
-                                "SnapshotId": "snap-abc",
-                            },
-                        },
-                    ],
-                }
-            ]
-        }
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image.Image(ctx, "test-image-1")
-        assert img._get(instance) == image._ImageInfo("ami-abc", "snap-abc")
+    instance = boto3_client_mock
+    instance.describe_images.return_value = _describe_images_payload("test-image-1", "ami-abc", "snap-abc")
+    ctx = ctx_config1
+    img = image.Image(ctx, "test-image-1")
+    assert img._get(instance) == image._ImageInfo("ami-abc", "snap-abc")
 
 
-def test_image__get_multiple_images():
+def test_image__get_multiple_images(boto3_client_mock, ctx_config1):
     """
     Test the Image._get() method with a multiple matching image
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_images.return_value = {
-            "Images": [
-                {
-                    "Name": "test-image-1",
-                    "ImageId": "ami-1,",
-                },
-                {
-                    "Name": "test-image-1",
-                    "ImageId": "ami-2,",
-                },
-            ]
-        }
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image.Image(ctx, "test-image-1")
-        with pytest.raises(exceptions.MultipleImagesException):
-            img._get(instance)
+    instance = boto3_client_mock
+    instance.describe_images.return_value = {
+        "Images": [
+            {
+                "Name": "test-image-1",
+                "ImageId": "ami-1,",
+            },
+            {
+                "Name": "test-image-1",
+                "ImageId": "ami-2,",
+            },
+        ]
+    }
+    ctx = ctx_config1
+    img = image.Image(ctx, "test-image-1")
+    with pytest.raises(exceptions.MultipleImagesException):
+        img._get(instance)
 
 
 @pytest.mark.parametrize(
     "imagename,expected_tags",
-    [
+    (
         # no image specific tags - assume the common tags
         (
             "test-image-1",
-            [
-                {"Key": "awspub:source:filename", "Value": "config1.vmdk"},
-                {"Key": "awspub:source:architecture", "Value": "x86_64"},
+            frozenset(
                 {
-                    "Key": "awspub:source:sha256",
-                    "Value": "6252475408b9f9ee64452b611d706a078831a99b123db69d144d878a0488a0a8",
-                },
-                {"Key": "name", "Value": "foobar"},
-            ],
+                    ("awspub:source:filename", "config1.vmdk"),
+                    ("awspub:source:architecture", "x86_64"),
+                    ("awspub:source:sha256", "6252475408b9f9ee64452b611d706a078831a99b123db69d144d878a0488a0a8"),
+                    ("name", "foobar"),
+                }
+            ),
         ),
         # with image specific tag but no override
         (
             "test-image-6",
-            [
-                {"Key": "awspub:source:filename", "Value": "config1.vmdk"},
-                {"Key": "awspub:source:architecture", "Value": "x86_64"},
+            frozenset(
                 {
-                    "Key": "awspub:source:sha256",
-                    "Value": "6252475408b9f9ee64452b611d706a078831a99b123db69d144d878a0488a0a8",
-                },
-                {"Key": "name", "Value": "foobar"},
-                {"Key": "key1", "Value": "value1"},
-            ],
+                    ("awspub:source:filename", "config1.vmdk"),
+                    ("awspub:source:architecture", "x86_64"),
+                    ("awspub:source:sha256", "6252475408b9f9ee64452b611d706a078831a99b123db69d144d878a0488a0a8"),
+                    ("name", "foobar"),
+                    ("key1", "value1"),
+                }
+            ),
         ),
         # with image specific tag which overrides common tag
         (
             "test-image-7",
-            [
-                {"Key": "awspub:source:filename", "Value": "config1.vmdk"},
-                {"Key": "awspub:source:architecture", "Value": "x86_64"},
+            frozenset(
                 {
-                    "Key": "awspub:source:sha256",
-                    "Value": "6252475408b9f9ee64452b611d706a078831a99b123db69d144d878a0488a0a8",
-                },
-                {"Key": "name", "Value": "not-foobar"},
-                {"Key": "key2", "Value": "name"},
-            ],
+                    ("awspub:source:filename", "config1.vmdk"),
+                    ("awspub:source:architecture", "x86_64"),
+                    ("awspub:source:sha256", "6252475408b9f9ee64452b611d706a078831a99b123db69d144d878a0488a0a8"),
+                    ("name", "not-foobar"),
+                    ("key2", "name"),
+                }
+            ),
         ),
-    ],
+    ),
 )
-def test_image__tags(imagename, expected_tags):
+def test_image__tags(imagename, expected_tags, ctx_config1):
     """
     Test the Image._tags() method
     """
-    ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-    img = image.Image(ctx, imagename)
-    assert img._tags == expected_tags
+    img = image.Image(ctx_config1, imagename)
+    tags = img._tags
+    # a tag key must only appear once and the (Key, Value) pairs must match
+    assert len(tags) == len(expected_tags)
+    assert {(tag["Key"], tag["Value"]) for tag in tags} == expected_tags
 
 
 @pytest.mark.parametrize(
     "available_images,expected",
-    [
+    (
         # image available
         ([{"Name": "test-image-6", "ImageId": "ami-123"}], {"eu-central-1": image._ImageInfo("ami-123", None)}),
         # image not available
         ([], {}),
-    ],
+    ),
 )
-def test_image_list(available_images, expected):
+def test_image_list(available_images, expected, boto3_client_mock, ctx_config1):
     """
     Test the list for a given image
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_images.return_value = {"Images": available_images}
-        instance.describe_regions.return_value = {
-            "Regions": [{"RegionName": "eu-central-1"}, {"RegionName": "us-east-1"}]
-        }
-        instance.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image.Image(ctx, "test-image-6")
-        assert img.list() == expected
+    instance = boto3_client_mock
+    instance.describe_images.return_value = {"Images": available_images}
+    ctx = ctx_config1
+    img = image.Image(ctx, "test-image-6")
+    assert img.list() == expected
 
 
 @patch("awspub.s3.S3.bucket_region", return_value="region1")
-def test_image_create_existing(s3_bucket_mock):
+def test_image_create_existing(s3_bucket_mock, boto3_client_mock, ctx_config1):
     """
     Test the create() method for a given image that already exist
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_snapshots.return_value = {"Snapshots": [{"SnapshotId": "snap-123"}]}
-        instance.describe_images.return_value = {
-            "Images": [
-                {
-                    "Name": "test-image-6",
-                    "ImageId": "ami-123",
-                    "RootDeviceName": "/dev/sda1",
-                    "BlockDeviceMappings": [
-                        {
-                            "DeviceName": "/dev/sda1",
-                            "Ebs": {
-                                "DeleteOnTermination": True,
-                                "SnapshotId": "snap-123",
-                            },
-                        },
-                    ],
-                }
-            ]
-        }
-        instance.describe_regions.return_value = {
-            "Regions": [{"RegionName": "eu-central-1"}, {"RegionName": "us-east-1"}]
-        }
-        instance.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image.Image(ctx, "test-image-6")
-        assert img.create() == {"eu-central-1": image._ImageInfo(image_id="ami-123", snapshot_id="snap-123")}
-        # register and create_tags shouldn't be called given that the image was already there
-        assert not instance.register_image.called
-        assert not instance.create_tags.called
+    instance = boto3_client_mock
+    instance.get_paginator.return_value.paginate.return_value = [{"Snapshots": [{"SnapshotId": "snap-123"}]}]
+    instance.describe_snapshots.return_value = {"Snapshots": [{"SnapshotId": "snap-123", "State": "completed"}]}
+    instance.describe_images.return_value = _describe_images_payload("test-image-6", "ami-123", "snap-123")
+    ctx = ctx_config1
+    img = image.Image(ctx, "test-image-6")
+    assert img.create() == {"eu-central-1": image._ImageInfo(image_id="ami-123", snapshot_id="snap-123")}
+    # register and create_tags shouldn't be called given that the image was already there
+    assert not instance.register_image.called
+    assert not instance.create_tags.called
 
 
 @pytest.mark.parametrize(
     "imagename,describe_images,get_parameters,get_parameters_called,put_parameter_called",
-    [
+    (
         # no image, no parameters (this should actually never happen but test it anyway)
         ("test-image-8", [], [], False, False),
         # with image, no parameter, no overwrite
@@ -402,32 +370,33 @@ def test_image_create_existing(s3_bucket_mock):
             False,
             True,
         ),
-    ],
+    ),
 )
 def test_image__put_ssm_parameters(
-    imagename, describe_images, get_parameters, get_parameters_called, put_parameter_called
+    imagename,
+    describe_images,
+    get_parameters,
+    get_parameters_called,
+    put_parameter_called,
+    boto3_client_mock,
+    ctx_config1,
 ):
     """
     Test the _put_ssm_parameters() method
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_images.return_value = {"Images": describe_images}
-        instance.get_parameters.return_value = {"Parameters": get_parameters}
-        instance.describe_regions.return_value = {
-            "Regions": [{"RegionName": "eu-central-1"}, {"RegionName": "us-east-1"}]
-        }
-        instance.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image.Image(ctx, imagename)
-        img._put_ssm_parameters()
-        assert instance.get_parameters.called == get_parameters_called
-        assert instance.put_parameter.called == put_parameter_called
+    instance = boto3_client_mock
+    instance.describe_images.return_value = {"Images": describe_images}
+    instance.get_parameters.return_value = {"Parameters": get_parameters}
+    ctx = ctx_config1
+    img = image.Image(ctx, imagename)
+    img._put_ssm_parameters()
+    assert instance.get_parameters.called == get_parameters_called
+    assert instance.put_parameter.called == put_parameter_called
 
 
 @pytest.mark.parametrize(
     "image_found,config,config_image_name, expected_problems",
-    [
+    (
         # image not available
         ([], "fixtures/config1.yaml", "test-image-6", [image.ImageVerificationErrors.NOT_EXIST]),
         # image matches expectations from config
@@ -460,37 +429,37 @@ def test_image__put_ssm_parameters(
             "test-image-6",
             [],
         ),
-    ],
+    ),
+    # short explicit ids so pytest doesn't repr the large nested dicts at collection
+    ids=["image-not-found", "image-matches"],
 )
-def test_image__verify(image_found, config, config_image_name, expected_problems):
+def test_image__verify(image_found, config, config_image_name, expected_problems, boto3_client_mock):
     """
     Test _verify() for a given image and configuration
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_images.return_value = {"Images": image_found}
-        instance.describe_snapshots.return_value = {"Snapshots": [{"State": "completed"}]}
-        ctx = context.Context(curdir / config, None)
-        img = image.Image(ctx, config_image_name)
-        problems = img._verify("eu-central-1")
-        assert problems == expected_problems
+    instance = boto3_client_mock
+    instance.describe_images.return_value = {"Images": image_found}
+    instance.describe_snapshots.return_value = {"Snapshots": [{"State": "completed"}]}
+    ctx = context.Context(curdir / config, None)
+    img = image.Image(ctx, config_image_name)
+    problems = img._verify("eu-central-1")
+    assert problems == expected_problems
 
 
 @pytest.mark.parametrize(
     "partition,imagename,share_list_expected",
-    [
+    (
         ("aws", "test-image-8", [{"UserId": "123456789123"}, {"UserId": "221020170000"}, {"UserId": "290620200000"}]),
         ("aws-cn", "test-image-8", [{"UserId": "334455667788"}]),
         ("aws-us-gov", "test-image-8", []),
-    ],
+    ),
 )
-def test_image__share_list_filtered(partition, imagename, share_list_expected):
+def test_image__share_list_filtered(partition, imagename, share_list_expected, boto3_client_mock, ctx_config1):
     """
     Test _share_list_filtered() for a given image
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.meta.partition = partition
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image.Image(ctx, imagename)
-        assert img._share_list_filtered(img.conf["share"]) == share_list_expected
+    instance = boto3_client_mock
+    instance.meta.partition = partition
+    ctx = ctx_config1
+    img = image.Image(ctx, imagename)
+    assert img._share_list_filtered(img.conf["share"]) == share_list_expected
@@ -1,9 +1,8 @@
 import pathlib
-from unittest.mock import patch
 
 import pytest
 
-from awspub import context, image_marketplace
+from awspub import image_marketplace
 
 curdir = pathlib.Path(__file__).parent.resolve()
 
@@ -17,17 +16,17 @@ curdir = pathlib.Path(__file__).parent.resolve()
         ("test-image-8", "2.0.0", True),
     ],
 )
-def test_image_marketplace_request_new_version(imagename, new_version, called_start_change_set):
+def test_image_marketplace_request_new_version(
+    imagename, new_version, called_start_change_set, boto3_client_mock, ctx_config1
+):
     """
     Test the request_new_version logic
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_entity.return_value = {"DetailsDocument": {"Versions": [{"VersionTitle": new_version}]}}
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        img = image_marketplace.ImageMarketplace(ctx, imagename)
-        img.request_new_version("ami-123")
-        assert instance.start_change_set.called == called_start_change_set
+    instance = boto3_client_mock
+    instance.describe_entity.return_value = {"DetailsDocument": {"Versions": [{"VersionTitle": new_version}]}}
+    img = image_marketplace.ImageMarketplace(ctx_config1, imagename)
+    img.request_new_version("ami-123")
+    assert instance.start_change_set.called == called_start_change_set
 
 
 @pytest.mark.parametrize(
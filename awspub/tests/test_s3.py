@@ -3,7 +3,7 @@ from unittest.mock import patch
 
 import pytest
 
-from awspub import context, s3
+from awspub import s3
 from awspub.exceptions import BucketDoesNotExistException
 
 curdir = pathlib.Path(__file__).parent.resolve()
@@ -38,27 +38,28 @@ curdir = pathlib.Path(__file__).parent.resolve()
         ),
     ],
 )
-def test_s3__get_multipart_upload_id(list_multipart_uploads_resp, create_multipart_upload_called):
+def test_s3__get_multipart_upload_id(
+    list_multipart_uploads_resp, create_multipart_upload_called, boto3_client_mock, ctx_config1
+):
     """
     test the _get_multipart_upload_id() function
     """
 
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.list_multipart_uploads.return_value = {"Uploads": list_multipart_uploads_resp}
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        sthree = s3.S3(ctx)
-        sthree._get_multipart_upload_id()
-        assert instance.create_multipart_upload.called == create_multipart_upload_called
+    instance = boto3_client_mock
+    instance.list_multipart_uploads.return_value = {"Uploads": list_multipart_uploads_resp}
+    ctx = ctx_config1
+    sthree = s3.S3(ctx)
+    sthree._get_multipart_upload_id()
+    assert instance.create_multipart_upload.called == create_multipart_upload_called
 
 
 @patch("awspub.s3.S3._bucket_exists", return_value=True)
 @patch("awspub.s3.boto3")
-def test_s3_bucket_region_bucket_exists(boto3_mock, bucket_exists_mock):
+def test_s3_bucket_region_bucket_exists(boto3_mock, bucket_exists_mock, ctx_config1):
     region_name = "sample-region-1"
     head_bucket = {"BucketRegion": region_name}
     boto3_mock.client.return_value.head_bucket.return_value = head_bucket
-    ctx = context.Context(curdir / "fixtures/config1.yaml", None)
+    ctx = ctx_config1
     sthree = s3.S3(ctx)
 
     assert sthree.bucket_region == region_name
@@ -66,8 +67,8 @@ def test_s3_bucket_region_bucket_exists(boto3_mock, bucket_exists_mock):
 
 @patch("awspub.s3.S3._bucket_exists", return_value=False)
 @patch("boto3.client")
-def test_s3_bucket_region_bucket_not_exists(bclient_mock, bucket_exists_mock):
-    ctx = context.Context(curdir / "fixtures/config1.yaml", None)
+def test_s3_bucket_region_bucket_not_exists(bclient_mock, bucket_exists_mock, ctx_config1):
+    ctx = ctx_config1
     sthree = s3.S3(ctx)
 
     with pytest.raises(BucketDoesNotExistException):
@@ -3,120 +3,121 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from awspub import context, snapshot
+from awspub import exceptions, snapshot
 
 curdir = pathlib.Path(__file__).parent.resolve()
 
 
-def test_snapshot__get_none_exist():
+_IMPORT_TASK_NAME = "021abb3f2338b5e57b5d870816565429659bc70769d71c486234ad60fe6aec67"
+
+
+def _import_task_response(status):
     """
-    No snapshot exist - should return None
+    A canned describe_import_snapshot_tasks response with the given task status
     """
-    ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-    s = snapshot.Snapshot(ctx)
-    client_mock = MagicMock()
-    assert s._get(client_mock, "snapshot-name") is None
-    client_mock.describe_snapshots.assert_called_with(
-        Filters=[
-            {"Name": "tag:Name", "Values": ["snapshot-name"]},
-            {"Name": "status", "Values": ["pending", "completed"]},
+    return {
+        "ImportSnapshotTasks": [
+            {
+                "ImportTaskId": "import-snap-08b79d7b5d382d56b",
+                "SnapshotTaskDetail": {
+                    "SnapshotId": "snap-0e0f3407a1b541c40",
+                    "Status": status,
+                },
+                "Tags": [
+                    {"Key": "Name", "Value": _IMPORT_TASK_NAME},
+                ],
+            }
         ],
-        OwnerIds=["self"],
-    )
+    }
+
+
+_IMPORT_TASK_COMPLETED = _import_task_response("completed")
+_IMPORT_TASK_ACTIVE = _import_task_response("active")
+
 
+_GET_EXPECTED_PAGINATE_KWARGS = dict(
+    Filters=[
+        {"Name": "tag:Name", "Values": ["snapshot-name"]},
+        {"Name": "status", "Values": ["pending", "completed"]},
+    ],
+    OwnerIds=["self"],
+    PaginationConfig={"MaxItems": 2, "PageSize": 5},
+)
 
-def test_snapshot__get_one_exist():
+
+@pytest.mark.parametrize(
+    "snapshots,expected_id,expect_raises",
+    (
+        # no snapshot exists - should return None
+        ([], None, False),
+        # one snapshot exists with the same name - should return the snapshot id
+        ([{"SnapshotId": "snap-1"}], "snap-1", False),
+        # multiple snapshots exist - should raise
+        ([{"SnapshotId": "snap-1"}, {"SnapshotId": "snap-2"}], None, True),
+    ),
+    ids=["none-exist", "one-exists", "multiple-exist"],
+)
+def test_snapshot__get(snapshots, expected_id, expect_raises, ctx_config1):
     """
-    One snapshot exist with the same name - should return the snapshot id
+    Test the _get() function for zero, one and multiple matching snapshots
     """
-    ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-    s = snapshot.Snapshot(ctx)
+    s = snapshot.Snapshot(ctx_config1)
     client_mock = MagicMock()
-    client_mock.describe_snapshots = MagicMock(return_value={"Snapshots": [{"SnapshotId": "snap-1"}]})
-    assert s._get(client_mock, "snapshot-name") == "snap-1"
-    client_mock.describe_snapshots.assert_called_with(
-        Filters=[
-            {"Name": "tag:Name", "Values": ["snapshot-name"]},
-            {"Name": "status", "Values": ["pending", "completed"]},
-        ],
-        OwnerIds=["self"],
-    )
+    client_mock.get_paginator.return_value.paginate.return_value = [{"Snapshots": snapshots}]
+    if expect_raises:
+        with pytest.raises(exceptions.MultipleSnapshotsException):
+            s._get(client_mock, "snapshot-name")
+    else:
+        assert s._get(client_mock, "snapshot-name") == expected_id
+    client_mock.get_paginator.return_value.paginate.assert_called_with(**_GET_EXPECTED_PAGINATE_KWARGS)
 
 
-def test_snapshot__get_multiple_exist():
+def test_snapshot_create_does_not_mutate_context_tags(ctx_config1):
     """
-    Multiple snapshots exist - _get() should raise an Exception
+    Calling create() multiple times must not grow the tags from context
+    and the Name tag must be included exactly once in the request
     """
-    ctx = context.Context(curdir / "fixtures/config1.yaml", None)
+    ctx = ctx_config1
     s = snapshot.Snapshot(ctx)
     client_mock = MagicMock()
-    client_mock.describe_snapshots = MagicMock(
-        return_value={"Snapshots": [{"SnapshotId": "snap-1"}, {"SnapshotId": "snap-2"}]}
-    )
-    with pytest.raises(Exception):
-        s._get(client_mock, "snapshot-name")
-    client_mock.describe_snapshots.assert_called_with(
-        Filters=[
-            {"Name": "tag:Name", "Values": ["snapshot-name"]},
-            {"Name": "status", "Values": ["pending", "completed"]},
+    client_mock.get_paginator.return_value.paginate.return_value = [{"Snapshots": []}]
+    client_mock.describe_snapshots.return_value = {"Snapshots": []}
+    client_mock.describe_import_snapshot_tasks.return_value = {
+        "ImportSnapshotTasks": [
+            {
+                "ImportTaskId": "import-snap-1",
+                "SnapshotTaskDetail": {"SnapshotId": "snap-1", "Status": "completed"},
+            }
         ],
-        OwnerIds=["self"],
-    )
+    }
+    client_mock.import_snapshot.return_value = {"ImportTaskId": "import-snap-1"}
+
+    tags_before = len(ctx.tags)
+    s.create(client_mock, "snapshot-name")
+    s.create(client_mock, "snapshot-name")
+    assert len(ctx.tags) == tags_before
 
+    tags_sent = client_mock.create_tags.call_args.kwargs["Tags"]
+    assert [t for t in tags_sent if t["Key"] == "Name"] == [{"Key": "Name", "Value": "snapshot-name"}]
 
-def test_snapshot__get_import_snapshot_task_completed():
+
+def test_snapshot__get_import_snapshot_task_completed(ctx_config1):
     """
     Test the Snapshot._get_import_snapshot_task() method
     """
-    ctx = context.Context(curdir / "fixtures/config1.yaml", None)
+    ctx = ctx_config1
     s = snapshot.Snapshot(ctx)
     client_mock = MagicMock()
-    client_mock.describe_import_snapshot_tasks = MagicMock(
-        return_value={
-            "ImportSnapshotTasks": [
-                {
-                    "ImportTaskId": "import-snap-08b79d7b5d382d56b",
-                    "SnapshotTaskDetail": {
-                        "SnapshotId": "snap-0e0f3407a1b541c40",
-                        "Status": "completed",
-                    },
-                    "Tags": [
-                        {"Key": "Name", "Value": "021abb3f2338b5e57b5d870816565429659bc70769d71c486234ad60fe6aec67"},
-                    ],
-                }
-            ],
-        }
-    )
-    assert (
-        s._get_import_snapshot_task(client_mock, "021abb3f2338b5e57b5d870816565429659bc70769d71c486234ad60fe6aec67")
-        is None
-    )
-
-
-def test_snapshot__get_import_snapshot_task_active():
+    client_mock.describe_import_snapshot_tasks.return_value = _IMPORT_TASK_COMPLETED
+    assert s._get_import_snapshot_task(client_mock, _IMPORT_TASK_NAME) is None
+
+
+def test_snapshot__get_import_snapshot_task_active(ctx_config1):
     """
     Test the Snapshot._get_import_snapshot_task() method
     """
-    ctx = context.Context(curdir / "fixtures/config1.yaml", None)
+    ctx = ctx_config1
     s = snapshot.Snapshot(ctx)
     client_mock = MagicMock()
-    client_mock.describe_import_snapshot_tasks = MagicMock(
-        return_value={
-            "ImportSnapshotTasks": [
-                {
-                    "ImportTaskId": "import-snap-08b79d7b5d382d56b",
-                    "SnapshotTaskDetail": {
-                        "SnapshotId": "snap-0e0f3407a1b541c40",
-                        "Status": "active",
-                    },
-                    "Tags": [
-                        {"Key": "Name", "Value": "021abb3f2338b5e57b5d870816565429659bc70769d71c486234ad60fe6aec67"},
-                    ],
-                }
-            ],
-        }
-    )
-    assert (
-        s._get_import_snapshot_task(client_mock, "021abb3f2338b5e57b5d870816565429659bc70769d71c486234ad60fe6aec67")
-        == "import-snap-08b79d7b5d382d56b"
-    )
+    client_mock.describe_import_snapshot_tasks.return_value = _IMPORT_TASK_ACTIVE
+    assert s._get_import_snapshot_task(client_mock, _IMPORT_TASK_NAME) == "import-snap-08b79d7b5d382d56b"
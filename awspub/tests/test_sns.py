@@ -1,37 +1,31 @@
 import pathlib
-from unittest.mock import patch
 
 import botocore.exceptions
 import pytest
 
-from awspub import context, exceptions, sns
+from awspub import exceptions, sns
 
 curdir = pathlib.Path(__file__).parent.resolve()
 
 
 @pytest.mark.parametrize(
-    "imagename,called_sns_publish, publish_call_count",
+    "imagename,publish_call_count",
     [
-        ("test-image-10", True, 1),
-        ("test-image-11", True, 2),
-        ("test-image-12", True, 2),
+        ("test-image-10", 1),
+        ("test-image-11", 2),
+        ("test-image-12", 2),
     ],
 )
-def test_sns_publish(imagename, called_sns_publish, publish_call_count):
+def test_sns_publish(imagename, publish_call_count, boto3_client_mock, ctx_config1):
     """
     Test the send_notification logic
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        instance.describe_regions.return_value = {
-            "Regions": [{"RegionName": "eu-central-1"}, {"RegionName": "us-east-1"}]
-        }
-        instance.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
+    instance = boto3_client_mock
+    ctx = ctx_config1
 
-        sns.SNSNotification(ctx, imagename).publish()
-        assert instance.publish.called == called_sns_publish
-        assert instance.publish.call_count == publish_call_count
+    sns.SNSNotification(ctx, imagename).publish()
+    # the call count check subsumes the redundant .called assertion
+    assert instance.publish.call_count == publish_call_count
 
 
 @pytest.mark.parametrize(
@@ -42,35 +36,30 @@ def test_sns_publish(imagename, called_sns_publish, publish_call_count):
         ("test-image-12"),
     ],
 )
-def test_sns_publish_fail_with_invalid_topic(imagename):
+def test_sns_publish_fail_with_invalid_topic(imagename, boto3_client_mock, ctx_config1):
     """
     Test the send_notification logic
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        instance.describe_regions.return_value = {
-            "Regions": [{"RegionName": "eu-central-1"}, {"RegionName": "us-east-1"}]
-        }
-        instance.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
-
-        # topic1 is invalid topic
-        def side_effect(*args, **kwargs):
-            topic_arn = kwargs.get("TopicArn")
-            if "topic1" in topic_arn and "us-east-1" in topic_arn:
-                error_reponse = {
-                    "Error": {
-                        "Code": "NotFoundException",
-                        "Message": "An error occurred (NotFound) when calling the Publish operation: "
-                        "Topic does not exist.",
-                    }
+    instance = boto3_client_mock
+    ctx = ctx_config1
+
+    # topic1 is invalid topic
+    def side_effect(*args, **kwargs):
+        topic_arn = kwargs.get("TopicArn")
+        if "topic1" in topic_arn and "us-east-1" in topic_arn:
+            error_reponse = {
+                "Error": {
+                    "Code": "NotFoundException",
+                    "Message": "An error occurred (NotFound) when calling the Publish operation: "
+                    "Topic does not exist.",
                 }
-                raise botocore.exceptions.ClientError(error_reponse, "")
+            }
+            raise botocore.exceptions.ClientError(error_reponse, "")
 
-        instance.publish.side_effect = side_effect
+    instance.publish.side_effect = side_effect
 
-        with pytest.raises(exceptions.AWSNotificationException):
-            sns.SNSNotification(ctx, imagename).publish()
+    with pytest.raises(exceptions.AWSNotificationException):
+        sns.SNSNotification(ctx, imagename).publish()
 
 
 @pytest.mark.parametrize(
@@ -81,28 +70,23 @@ def test_sns_publish_fail_with_invalid_topic(imagename):
         ("test-image-12"),
     ],
 )
-def test_sns_publish_fail_with_unauthorized_user(imagename):
+def test_sns_publish_fail_with_unauthorized_user(imagename, boto3_client_mock, ctx_config1):
     """
     Test the send_notification logic
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        instance.describe_regions.return_value = {
-            "Regions": [{"RegionName": "eu-central-1"}, {"RegionName": "us-east-1"}]
-        }
-        instance.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
+    instance = boto3_client_mock
+    ctx = ctx_config1
 
-        error_reponse = {
-            "Error": {
-                "Code": "AuthorizationError",
-                "Message": "User are not authorized perform SNS Notification service",
-            }
+    error_reponse = {
+        "Error": {
+            "Code": "AuthorizationError",
+            "Message": "User are not authorized perform SNS Notification service",
         }
-        instance.publish.side_effect = botocore.exceptions.ClientError(error_reponse, "")
+    }
+    instance.publish.side_effect = botocore.exceptions.ClientError(error_reponse, "")
 
-        with pytest.raises(exceptions.AWSAuthorizationException):
-            sns.SNSNotification(ctx, imagename).publish()
+    with pytest.raises(exceptions.AWSAuthorizationException):
+        sns.SNSNotification(ctx, imagename).publish()
 
 
 @pytest.mark.parametrize(
@@ -134,28 +118,28 @@ def test_sns_publish_fail_with_unauthorized_user(imagename):
         ),
     ],
 )
-def test_sns__get_topic_arn(imagename, partition, regions_in_partition, expected):
+def test_sns__get_topic_arn(imagename, partition, regions_in_partition, expected, boto3_client_mock, ctx_config1):
     """
     Test the send_notification logic
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        sns_conf = ctx.conf["images"][imagename]["sns"]
-        instance.describe_regions.return_value = {"Regions": [{"RegionName": r} for r in regions_in_partition]}
-        instance.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
+    instance = boto3_client_mock
+    ctx = ctx_config1
+    sns_conf = ctx.conf["images"][imagename]["sns"]
+    instance.describe_regions.return_value = {"Regions": [{"RegionName": r} for r in regions_in_partition]}
 
-        instance.get_caller_identity.return_value = {"Account": "1234", "Arn": f"arn:{partition}:iam::1234:user/test"}
+    instance.get_caller_identity.return_value = {"Account": "1234", "Arn": f"arn:{partition}:iam::1234:user/test"}
 
-        topic_arns = []
-        for topic in sns_conf:
-            for topic_name, topic_conf in topic.items():
-                sns_regions = sns.SNSNotification(ctx, imagename)._sns_regions(topic_conf)
-                for region in sns_regions:
-                    res_arn = sns.SNSNotification(ctx, imagename)._get_topic_arn(topic_name, region)
-                    topic_arns.append(res_arn)
+    # one notification object is enough - construct it outside the loops, and
+    # flatten the topic/region product into a single comprehension
+    notification = sns.SNSNotification(ctx, imagename)
+    topic_items = [(topic_name, topic_conf) for topic in sns_conf for topic_name, topic_conf in topic.items()]
+    topic_arns = [
+        notification._get_topic_arn(topic_name, region)
+        for topic_name, topic_conf in topic_items
+        for region in notification._sns_regions(topic_conf)
+    ]
 
-        assert topic_arns == expected
+    assert topic_arns == expected
 
 
 @pytest.mark.parametrize(
@@ -170,20 +154,19 @@ def test_sns__get_topic_arn(imagename, partition, regions_in_partition, expected
         ("test-image-12", ["eu-northwest-1", "ap-southeast-1"], {"topic1": ["eu-northwest-1", "ap-southeast-1"]}),
     ],
 )
-def test_sns_regions(imagename, regions_in_partition, regions_expected):
+def test_sns_regions(imagename, regions_in_partition, regions_expected, boto3_client_mock, ctx_config1):
     """
     Test the regions for a given image
     """
-    with patch("boto3.client") as bclient_mock:
-        instance = bclient_mock.return_value
-        instance.describe_regions.return_value = {"Regions": [{"RegionName": r} for r in regions_in_partition]}
-        ctx = context.Context(curdir / "fixtures/config1.yaml", None)
-        sns_conf = ctx.conf["images"][imagename]["sns"]
-        instance.list_buckets.return_value = {"Buckets": [{"Name": "bucket1"}]}
-
-        sns_regions = {}
-        for topic in sns_conf:
-            for topic_name, topic_conf in topic.items():
-                sns_regions[topic_name] = sns.SNSNotification(ctx, imagename)._sns_regions(topic_conf)
-
-        assert sns_regions == regions_expected
+    instance = boto3_client_mock
+    instance.describe_regions.return_value = {"Regions": [{"RegionName": r} for r in regions_in_partition]}
+    ctx = ctx_config1
+    sns_conf = ctx.conf["images"][imagename]["sns"]
+
+    notification = sns.SNSNotification(ctx, imagename)
+    sns_regions = {}
+    for topic in sns_conf:
+        for topic_name, topic_conf in topic.items():
+            sns_regions[topic_name] = notification._sns_regions(topic_conf)
+
+    assert sns_regions == regions_expected
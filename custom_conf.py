@@ -1,4 +1,5 @@
 import datetime
+import os
 from requirements_parser import _get_requirements
 
 # Custom configuration for the Sphinx documentation builder.
@@ -237,3 +238,14 @@ rst_prolog = '''
 .. role:: center
    :class: align-center
 '''
+
+# Narrow autodoc to what the published docs actually show. Re-rendering every
+# pydantic model's JSON schema is the slowest autodoc-pydantic option, so only
+# do it when a full build is explicitly requested via SPHINX_FULL=1.
+autodoc_pydantic_model_show_json = os.environ.get('SPHINX_FULL') == '1'
+# render type hints into the description instead of re-stringifying signatures
+autodoc_typehints = 'description'
+autodoc_default_options = {
+    'members': True,
+    'undoc-members': False,
+}
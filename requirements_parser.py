@@ -1,20 +1,15 @@
-import tomllib
+import re
 
 LOCK = 'poetry.lock'
 
+# in the poetry.lock format a line-anchored 'name = "..."' entry only occurs in
+# [[package]] blocks, so a line scan finds exactly the package names
+_PACKAGE_NAME_RE = re.compile(r'^name = "([^"]+)"', re.MULTILINE)
 
-def _get_requirements() -> list[str]:
-    c = _read_config()
-
-    deps = set()
-
-    for dep in c["package"]:
-        deps.add(dep['name'])
 
-    return list(deps)
-
-
-def _read_config() -> dict:
-    with open(LOCK, 'rb') as f:
-        config = tomllib.load(f)
-    return config
+def _get_requirements() -> list[str]:
+    # scan for the package name entries instead of parsing the whole lockfile
+    # with tomllib, which materializes thousands of dict entries (dependencies,
+    # extras, file hashes) that would be thrown away immediately
+    with open(LOCK, 'r') as f:
+        return list(set(_PACKAGE_NAME_RE.findall(f.read())))